@@ -18,6 +18,8 @@ from aws_cdk import (
     aws_events as events,
     aws_events_targets as targets,
     aws_dynamodb as dynamodb,
+    aws_sqs as sqs,
+    aws_lambda_event_sources as lambda_event_sources,
 )
 from constructs import Construct
 import platform
@@ -40,6 +42,19 @@ class PDFAccessibility(Stack):
                               exposed_headers=[]
                           )])
         
+        # The bucket is versioned, so deleting temp files (by the pipeline or the failure
+        # cleanup Lambda) only adds delete markers. Let S3 reclaim the old versions and
+        # stale markers under temp/ instead of keeping every intermediate file forever.
+        # Current temp/ objects are left alone: running executions and the report
+        # generator still read them.
+        pdf_processing_bucket.add_lifecycle_rule(
+            id="ExpireDeletedTempFiles",
+            prefix="temp/",
+            noncurrent_version_expiration=Duration.days(1),
+            expired_object_delete_marker=True,
+            abort_incomplete_multipart_upload_after=Duration.days(1)
+        )
+        
         # Get account and region for use throughout the stack
         account_id = Stack.of(self).account
         region = Stack.of(self).region
@@ -420,7 +435,8 @@ class PDFAccessibility(Stack):
             architecture=lambda_arch,
             environment={
                 'BUCKET_NAME': pdf_processing_bucket.bucket_name,
-                'TZ': 'US/Eastern'  # Set timezone for local time in filenames
+                'TZ': 'US/Eastern',  # Set timezone for local time in filenames
+                'INCLUDE_PAGE_COUNT': 'true'  # 'false' skips reading the PDFs for page counts
             }
         )
         
@@ -623,7 +639,23 @@ class PDFAccessibility(Stack):
             projection_type=dynamodb.ProjectionType.ALL
         )
         
-        # CloudWatch log group for cleanup events
+        # Sparse GSI of unnotified failures: pending_date is set when a failure is recorded
+        # and removed once the digest has been sent, so the digest reads only pending records
+        pdf_failure_records_table.add_global_secondary_index(
+            index_name="pending_date-index",
+            partition_key=dynamodb.Attribute(
+                name="pending_date",
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="iam_username",
+                type=dynamodb.AttributeType.STRING
+            ),
+            projection_type=dynamodb.ProjectionType.ALL
+        )
+        
+        # CloudWatch log group that held cleanup events before they were logged only to the
+        # cleanup Lambda's own log group; kept so dashboards still show historical events
         pdf_cleanup_log_group = logs.LogGroup(
             self, "PdfCleanupLogGroup",
             log_group_name="/pdf-processing/cleanup",
@@ -631,6 +663,19 @@ class PDFAccessibility(Stack):
             removal_policy=cdk.RemovalPolicy.RETAIN
         )
         
+        # Optional CloudTrail Lake event data store ID for indexed uploader lookups
+        # (pass via -c cloudtrail_event_data_store=<id> or cdk.context.json)
+        cloudtrail_event_data_store = self.node.try_get_context("cloudtrail_event_data_store") or ""
+        
+        # Set -c resolve_uploader=false to skip the CloudTrail uploader lookup during cleanup
+        # (failures are then reported to the 'default' digest recipient)
+        resolve_uploader = str(self.node.try_get_context("resolve_uploader") or "true").lower() != "false"
+        
+        # Set -c trust_uploader_metadata=true to take the uploader from the PDF's
+        # x-amz-meta-uploaded-by metadata. The header is unauthenticated, so only enable this
+        # when every upload goes through a trusted path that sets it.
+        trust_uploader_metadata = str(self.node.try_get_context("trust_uploader_metadata") or "false").lower() == "true"
+        
         # Lambda function for PDF failure cleanup (triggered by Step Function failures)
         pdf_failure_cleanup_lambda = lambda_.Function(
             self, "PdfFailureCleanupLambda",
@@ -643,8 +688,10 @@ class PDFAccessibility(Stack):
             architecture=lambda_arch,
             environment={
                 "FAILURE_TABLE": pdf_failure_records_table.table_name,
-                "LOG_GROUP_NAME": pdf_cleanup_log_group.log_group_name,
-                "BUCKET_NAME": pdf_processing_bucket.bucket_name
+                "BUCKET_NAME": pdf_processing_bucket.bucket_name,
+                "CLOUDTRAIL_EVENT_DATA_STORE": cloudtrail_event_data_store,
+                "RESOLVE_UPLOADER": "true" if resolve_uploader else "false",
+                "TRUST_UPLOADER_METADATA": "true" if trust_uploader_metadata else "false"
             }
         )
         
@@ -652,16 +699,25 @@ class PDFAccessibility(Stack):
         pdf_processing_bucket.grant_read(pdf_failure_cleanup_lambda)
         pdf_processing_bucket.grant_delete(pdf_failure_cleanup_lambda)
         pdf_failure_records_table.grant_write_data(pdf_failure_cleanup_lambda)
-        pdf_cleanup_log_group.grant_write(pdf_failure_cleanup_lambda)
         
         # CloudTrail permissions for identifying who uploaded the file
-        pdf_failure_cleanup_lambda.add_to_role_policy(
-            iam.PolicyStatement(
-                effect=iam.Effect.ALLOW,
-                actions=["cloudtrail:LookupEvents"],
-                resources=["*"]
+        if resolve_uploader:
+            pdf_failure_cleanup_lambda.add_to_role_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["cloudtrail:LookupEvents"],
+                    resources=["*"]
+                )
+            )
+        
+        if resolve_uploader and cloudtrail_event_data_store:
+            pdf_failure_cleanup_lambda.add_to_role_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["cloudtrail:StartQuery", "cloudtrail:GetQueryResults"],
+                    resources=[f"arn:aws:cloudtrail:{region}:{account_id}:eventdatastore/{cloudtrail_event_data_store}"]
+                )
             )
-        )
         
         # EventBridge rule to trigger cleanup on Step Function failures
         pdf_failure_rule = events.Rule(
@@ -677,7 +733,32 @@ class PDFAccessibility(Stack):
                 }
             )
         )
-        pdf_failure_rule.add_target(targets.LambdaFunction(pdf_failure_cleanup_lambda))
+        
+        # Failure events are queued and delivered to the cleanup Lambda in batches, so one
+        # invocation handles several failures and writes their records together
+        pdf_failure_cleanup_dlq = sqs.Queue(
+            self, "PdfFailureCleanupDLQ",
+            retention_period=Duration.days(14),
+            enforce_ssl=True
+        )
+        pdf_failure_cleanup_queue = sqs.Queue(
+            self, "PdfFailureCleanupQueue",
+            visibility_timeout=Duration.minutes(30),  # 6x the cleanup Lambda timeout
+            enforce_ssl=True,
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=3,
+                queue=pdf_failure_cleanup_dlq
+            )
+        )
+        pdf_failure_rule.add_target(targets.SqsQueue(pdf_failure_cleanup_queue))
+        pdf_failure_cleanup_lambda.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                pdf_failure_cleanup_queue,
+                batch_size=10,
+                max_batching_window=Duration.seconds(30),
+                report_batch_item_failures=True
+            )
+        )
         
         # SSM Parameters for digest configuration (can be changed without redeploying)
         # Email enabled: aws ssm put-parameter --name "/pdf-processing/email-enabled" --value "true" --type String
@@ -686,7 +767,7 @@ class PDFAccessibility(Stack):
         email_enabled_param_name = "/pdf-processing/email-enabled"
         
         # Lambda function for daily digest (triggered at 11:55 PM)
-        # If email disabled, saves reports to S3: reports/deletion_reports/{username}/{username}-{timestamp}.txt
+        # If email disabled, saves reports to S3: reports/deletion_reports/{username}/{username}-{timestamp}.txt.gz
         pdf_failure_digest_lambda = lambda_.Function(
             self, "PdfFailureDigestLambda",
             function_name="pdf-failure-digest-handler",
@@ -729,11 +810,12 @@ class PDFAccessibility(Stack):
             )
         )
         
-        # SES permissions for sending notification emails (when enabled)
+        # SES permissions for sending notification emails (when enabled); GetSendQuota
+        # lets the digest pace concurrent sends to the account's maximum send rate
         pdf_failure_digest_lambda.add_to_role_policy(
             iam.PolicyStatement(
                 effect=iam.Effect.ALLOW,
-                actions=["ses:SendEmail"],
+                actions=["ses:SendEmail", "ses:GetSendQuota"],
                 resources=["*"]
             )
         )
@@ -747,8 +829,9 @@ class PDFAccessibility(Stack):
         )
         pdf_digest_schedule.add_target(targets.LambdaFunction(pdf_failure_digest_lambda))
         
-        # Store log group name for dashboard
+        # Store log group names for dashboard (cleanup events are logged by the Lambda itself)
         pdf_cleanup_log_group_name = pdf_cleanup_log_group.log_group_name
+        pdf_failure_cleanup_lambda_log_group_name = f"/aws/lambda/{pdf_failure_cleanup_lambda.function_name}"
 
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
         dashboard_name = f"PDF_Processing_Dashboard-{timestamp}"
@@ -812,7 +895,7 @@ class PDFAccessibility(Stack):
             ),
             cloudwatch.LogQueryWidget(
                 title="Processing Failures",
-                log_group_names=[pdf_cleanup_log_group_name],
+                log_group_names=[pdf_failure_cleanup_lambda_log_group_name, pdf_cleanup_log_group_name],
                 query_string='''fields @timestamp, @message
                     | filter @message like /PIPELINE_FAILURE_CLEANUP/
                     | sort @timestamp desc
@@ -927,7 +1010,7 @@ class PDFAccessibility(Stack):
         dashboard.add_widgets(
             cloudwatch.LogQueryWidget(
                 title="Pipeline Failure Cleanup Activity",
-                log_group_names=[pdf_cleanup_log_group_name],
+                log_group_names=[pdf_failure_cleanup_lambda_log_group_name, pdf_cleanup_log_group_name],
                 query_string='''fields @timestamp, @message
                     | filter @message like /PIPELINE_FAILURE_CLEANUP/
                     | parse @message '{"timestamp":*,"event_type":*,"execution_arn":*,"failure_reason":"*","deleted_pdf":"*","deleted_temp_folder":*,"temp_files_deleted":*,"uploaded_by":"*","uploaded_by_arn":*}' as ts, evt, arn, failure_reason, deleted_pdf, temp_folder, temp_files, uploaded_by, user_arn
@@ -939,7 +1022,7 @@ class PDFAccessibility(Stack):
             ),
             cloudwatch.LogQueryWidget(
                 title="Failures by User (Today)",
-                log_group_names=[pdf_cleanup_log_group_name],
+                log_group_names=[pdf_failure_cleanup_lambda_log_group_name, pdf_cleanup_log_group_name],
                 query_string='''fields @timestamp, @message
                     | filter @message like /PIPELINE_FAILURE_CLEANUP/
                     | parse @message '"uploaded_by":"*"' as user
@@ -951,7 +1034,7 @@ class PDFAccessibility(Stack):
             ),
             cloudwatch.LogQueryWidget(
                 title="Failure Reasons Summary",
-                log_group_names=[pdf_cleanup_log_group_name],
+                log_group_names=[pdf_failure_cleanup_lambda_log_group_name, pdf_cleanup_log_group_name],
                 query_string='''fields @timestamp, @message
                     | filter @message like /PIPELINE_FAILURE_CLEANUP/
                     | parse @message '"failure_reason":"*"' as reason
@@ -80,7 +80,7 @@ def show_email_status():
     
     print()
     print("When email is disabled, reports are saved to:")
-    print("  s3://bucket/reports/deletion_reports/{username}/{username}-{timestamp}.txt")
+    print("  s3://bucket/reports/deletion_reports/{username}/{username}-{timestamp}.txt.gz")
     
     return True
 
@@ -136,15 +136,16 @@ def reset_todays_notifications():
             print(f"  No failures found for {today}")
             return 0
         
-        # Reset notified flag for each item
+        # Reset notified flag for each item (and restore pending_date so the
+        # digest's pending_date-index sees it again)
         reset_count = 0
         for item in items:
             failure_id = item.get('failure_id')
             if failure_id:
                 table.update_item(
                     Key={'failure_id': failure_id},
-                    UpdateExpression='SET notified = :n',
-                    ExpressionAttributeValues={':n': False}
+                    UpdateExpression='SET notified = :n, pending_date = :date',
+                    ExpressionAttributeValues={':n': False, ':date': today}
                 )
                 reset_count += 1
         
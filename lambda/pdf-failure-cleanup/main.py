@@ -1,34 +1,78 @@
 """
 PDF Failure Cleanup Lambda
 
-Triggered by EventBridge when a Step Function execution fails, times out, or is aborted.
+Triggered when a Step Function execution fails, times out, or is aborted. EventBridge sends
+the failure events to an SQS queue, which invokes this Lambda with batches of events.
 Automatically deletes the original PDF and its temp folder, then stores a failure record
 for the daily digest email.
 """
 
-import json
 import os
+import re
 import boto3
+import orjson
 import logging
-import uuid
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from ulid import ULID
 
-# Configure logging
+# Configure logging. Set LOG_LEVEL=DEBUG to log full incoming events.
+DEBUG = os.environ.get('LOG_LEVEL', 'INFO').upper() == 'DEBUG'
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
 
-# Initialize AWS clients
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-cloudtrail = boto3.client('cloudtrail')
-logs = boto3.client('logs')
+# Shared client config: a connection pool large enough for parallel delete_objects
+# batches, adaptive retries to absorb S3 SlowDown/throttling, short timeouts and keep-alive
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    connect_timeout=2,
+    read_timeout=10,
+    tcp_keepalive=True
+)
+
+# Initialize AWS clients from one shared session
+session = boto3.session.Session()
+s3 = session.client('s3', config=AWS_CLIENT_CONFIG)
+dynamodb_client = session.client('dynamodb', config=AWS_CLIENT_CONFIG)
+cloudtrail = session.client('cloudtrail', config=AWS_CLIENT_CONFIG)
 
 # Environment variables
 FAILURE_TABLE = os.environ.get('FAILURE_TABLE', 'pdf-failure-records')
-LOG_GROUP_NAME = os.environ.get('LOG_GROUP_NAME', '/pdf-processing/cleanup')
 BUCKET_NAME = os.environ.get('BUCKET_NAME', '')
+# Optional CloudTrail Lake event data store ID (must capture S3 data events).
+# When set, the uploader is found with an indexed SQL query instead of a LookupEvents scan.
+CLOUDTRAIL_EVENT_DATA_STORE = os.environ.get('CLOUDTRAIL_EVENT_DATA_STORE', '')
+# Set RESOLVE_UPLOADER=false to skip the CloudTrail uploader lookup (the slowest step, and
+# LookupEvents is limited to 2 TPS per account). Records are then stored with an 'unknown'
+# uploader, which the digest sends to the 'default' recipient.
+RESOLVE_UPLOADER = os.environ.get('RESOLVE_UPLOADER', 'true').lower() != 'false'
+# Set TRUST_UPLOADER_METADATA=true to take the uploader from the PDF's uploaded-by metadata.
+# Anyone with PutObject can set that header (and so redirect the digest), so it is off by
+# default and the uploader comes from CloudTrail.
+TRUST_UPLOADER_METADATA = os.environ.get('TRUST_UPLOADER_METADATA', 'false').lower() == 'true'
+
+# A CloudTrail Lake query is polled for at most LAKE_QUERY_TIMEOUT seconds. Across an SQS
+# batch, Lake polling also stops LAKE_TIME_RESERVE seconds before the Lambda timeout,
+# leaving time for the remaining cleanups and the DynamoDB write; later lookups then go
+# straight to LookupEvents.
+LAKE_QUERY_TIMEOUT = 20
+LAKE_TIME_RESERVE = 60
+
+# Number of delete_objects batches (up to 1000 keys each) issued concurrently
+DELETE_WORKERS = 8
+# Listing pauses once this many batches are queued or in flight, bounding memory
+MAX_PENDING_DELETES = DELETE_WORKERS * 2
+
+# Failure records expire (via the table's 'ttl' attribute) after this many days
+FAILURE_RECORD_TTL_DAYS = 30
+
+# Folder and filename segments of a chunk key (temp/[folder]/[filename]/...)
+_CHUNK_KEY_RE = re.compile(r'temp/([^/]*)/([^/]*)')
 
 
 def extract_pdf_key_from_execution(execution_input: dict) -> Optional[str]:
@@ -41,25 +85,19 @@ def extract_pdf_key_from_execution(execution_input: dict) -> Optional[str]:
     - chunks: array of chunk information
     """
     # Try common input field names
-    if 's3_key' in execution_input:
-        return execution_input['s3_key']
-    if 'pdf_key' in execution_input:
-        return execution_input['pdf_key']
-    if 'key' in execution_input:
-        return execution_input['key']
+    for field in ('s3_key', 'pdf_key', 'key'):
+        value = execution_input.get(field)
+        if value:
+            return value
     
     # Try to extract from chunks if present
-    if 'chunks' in execution_input and len(execution_input['chunks']) > 0:
-        chunk = execution_input['chunks'][0]
-        if 'chunk_key' in chunk:
+    # chunk_key format: temp/[folder]/[filename]/chunks/chunk_001.pdf
+    chunks = execution_input.get('chunks')
+    if chunks:
+        match = _CHUNK_KEY_RE.match(chunks[0].get('chunk_key', ''))
+        if match:
             # Derive original PDF path from chunk path
-            # chunk_key format: temp/[folder]/[filename]/chunks/chunk_001.pdf
-            chunk_key = chunk['chunk_key']
-            parts = chunk_key.split('/')
-            if len(parts) >= 3 and parts[0] == 'temp':
-                folder = parts[1]
-                filename = parts[2]
-                return f"pdf/{folder}/{filename}.pdf"
+            return f"pdf/{match.group(1)}/{match.group(2)}.pdf"
     
     logger.warning(f"Could not extract PDF key from execution input: {execution_input}")
     return None
@@ -76,13 +114,14 @@ def get_temp_folder_path(pdf_key: str) -> Optional[str]:
         logger.warning(f"Unexpected PDF path format: {pdf_key}")
         return None
     
-    # Remove 'pdf/' prefix and '.pdf' extension
-    relative_path = pdf_key[4:]  # Remove 'pdf/'
+    # Remove 'pdf/' prefix and '.pdf' extension (any case) in a single slice.
+    # Lowercasing just the last four characters avoids copying the whole key.
+    if pdf_key[-4:].lower() == '.pdf':
+        relative_path = pdf_key[4:-4]
+    else:
+        relative_path = pdf_key[4:]
     
-    if relative_path.lower().endswith('.pdf'):
-        relative_path = relative_path[:-4]  # Remove '.pdf'
-    
-    return f"temp/{relative_path}/"
+    return 'temp/' + relative_path + '/'
 
 
 def delete_s3_object(bucket: str, key: str) -> bool:
@@ -96,74 +135,270 @@ def delete_s3_object(bucket: str, key: str) -> bool:
         return False
 
 
-def delete_temp_folder(bucket: str, temp_prefix: str) -> int:
+def delete_objects_batch(
+    bucket: str,
+    objects_to_delete: list,
+    temp_prefix: str,
+    pdf_key: Optional[str] = None
+) -> Tuple[int, bool]:
     """
-    Delete all objects under the temp folder prefix.
-    Returns the number of objects deleted.
+    Delete one batch of up to 1000 objects.
+
+    Quiet mode makes S3 return only the keys that failed, not an entry per deleted key.
+    If the batch also carries the original PDF (pdf_key), it is left out of the count.
+    Returns (temp objects deleted, whether pdf_key was deleted).
+    """
+    response = s3.delete_objects(
+        Bucket=bucket,
+        Delete={'Objects': objects_to_delete, 'Quiet': True}
+    )
+
+    errors = response.get('Errors', [])
+    for error in errors:
+        logger.error(f"Error deleting {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+
+    deleted = len(objects_to_delete) - len(errors)
+    pdf_deleted = bool(pdf_key) and not any(error.get('Key') == pdf_key for error in errors)
+    if pdf_deleted:
+        logger.info(f"Deleted s3://{bucket}/{pdf_key}")
+        deleted -= 1
+    # Per-batch detail only at DEBUG; delete_temp_folder logs the total once
+    logger.debug("Deleted %d objects from %s", deleted, temp_prefix)
+    return deleted, pdf_deleted
+
+
+def sum_deleted(futures, temp_prefix: str) -> int:
+    """Wait for delete_objects_batch futures and total the temp objects they deleted."""
+    deleted = 0
+    for future in as_completed(futures):
+        try:
+            deleted += future.result()[0]
+        except ClientError as e:
+            logger.error(f"Error deleting batch from {temp_prefix}: {e}")
+    return deleted
+
+
+def delete_temp_folder(bucket: str, temp_prefix: str, pdf_key: Optional[str] = None) -> int:
+    """
+    Delete all objects under the temp folder prefix, plus the original PDF if given.
+    
+    The PDF rides along in the first delete_objects batch (the first listing asks for
+    999 keys to leave room for it) instead of costing its own DeleteObject call. If
+    that batch fails or reports the PDF in its Errors, or the listing fails before the
+    batch is sent, the PDF is deleted on its own instead.
+    A single list call covers the common case of an empty or small (<1000 objects)
+    folder. Larger folders are paginated, with each page's delete_objects batch
+    submitted to a thread pool so deletes overlap with the remaining listing. At most
+    MAX_PENDING_DELETES batches are held at once, so memory stays bounded however
+    large the folder is. Returns the number of temp objects deleted.
     """
     deleted_count = 0
+    pdf_deleted = False
     
     try:
-        paginator = s3.get_paginator('list_objects_v2')
+        first_page = s3.list_objects_v2(
+            Bucket=bucket,
+            Prefix=temp_prefix,
+            MaxKeys=999 if pdf_key else 1000
+        )
         
-        for page in paginator.paginate(Bucket=bucket, Prefix=temp_prefix):
-            if 'Contents' not in page:
-                continue
+        first_batch = [{'Key': obj['Key']} for obj in first_page.get('Contents', [])]
+        if not first_batch:
+            logger.info(f"No objects found under {temp_prefix}")
+        if pdf_key:
+            first_batch.append({'Key': pdf_key})
+        
+        if not first_page.get('IsTruncated'):
+            if first_batch:
+                deleted_count, pdf_deleted = delete_objects_batch(bucket, first_batch, temp_prefix, pdf_key)
+                logger.info("Total objects deleted from %s: %d", temp_prefix, deleted_count)
+        else:
+            paginator = s3.get_paginator('list_objects_v2')
             
-            objects_to_delete = [{'Key': obj['Key']} for obj in page['Contents']]
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                first_future = executor.submit(delete_objects_batch, bucket, first_batch, temp_prefix, pdf_key)
+                pending = {first_future}
+                
+                try:
+                    pages = paginator.paginate(
+                        Bucket=bucket,
+                        Prefix=temp_prefix,
+                        ContinuationToken=first_page['NextContinuationToken']
+                    )
+                    for page in pages:
+                        if 'Contents' not in page:
+                            continue
+                        
+                        objects_to_delete = [{'Key': obj['Key']} for obj in page['Contents']]
+                        
+                        if objects_to_delete:
+                            if len(pending) >= MAX_PENDING_DELETES:
+                                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                                deleted_count += sum_deleted(done, temp_prefix)
+                            pending.add(executor.submit(
+                                delete_objects_batch, bucket, objects_to_delete, temp_prefix
+                            ))
+                    
+                    deleted_count += sum_deleted(pending, temp_prefix)
+                finally:
+                    # The first batch carried the PDF; it only counts as deleted if that
+                    # batch succeeded without listing the PDF among its errors
+                    if first_future.exception() is None:
+                        pdf_deleted = first_future.result()[1]
             
-            if objects_to_delete:
-                s3.delete_objects(
-                    Bucket=bucket,
-                    Delete={'Objects': objects_to_delete}
-                )
-                deleted_count += len(objects_to_delete)
-                logger.info(f"Deleted {len(objects_to_delete)} objects from {temp_prefix}")
-        
-        logger.info(f"Total objects deleted from {temp_prefix}: {deleted_count}")
+            logger.info("Total objects deleted from %s: %d", temp_prefix, deleted_count)
         
     except ClientError as e:
         logger.error(f"Error deleting temp folder {temp_prefix}: {e}")
     
+    # Still remove the PDF if its batch was never sent, failed, or reported it as an error
+    if pdf_key and not pdf_deleted:
+        delete_s3_object(bucket, pdf_key)
+    
     return deleted_count
 
 
-def get_uploader_info(bucket: str, key: str) -> dict:
+def build_uploader_info(arn: str, user_name: Optional[str], identity_type: Optional[str]) -> dict:
+    """Build the uploader info dict from CloudTrail userIdentity fields."""
+    username = 'unknown'
+    if '/' in arn:
+        username = arn.split('/')[-1]
+    elif user_name:
+        username = user_name
+    
+    return {
+        'username': username,
+        'arn': arn,
+        'type': identity_type or 'unknown'
+    }
+
+
+def sql_quote(value: str) -> str:
+    """Quote a string literal for a CloudTrail Lake SQL statement."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def get_uploader_info_from_lake(bucket: str, key: str, now: datetime, deadline: float) -> Optional[dict]:
+    """
+    Query CloudTrail Lake for the PutObject event of this exact bucket/key.
+    
+    Lake filters on requestParameters server-side, so this finds the upload without
+    scanning unrelated events. Polling stops at `deadline` (time.monotonic()), the
+    invocation's Lake budget. Returns None if the query fails, finds nothing, or
+    doesn't finish in time.
+    """
+    if time.monotonic() >= deadline:
+        logger.warning(f"No time left for a CloudTrail Lake query for {bucket}/{key}")
+        return None
+    
+    start_time = (now - timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S')
+    query = (
+        "SELECT userIdentity.arn, userIdentity.username, userIdentity.type "
+        f"FROM {CLOUDTRAIL_EVENT_DATA_STORE} "
+        "WHERE eventName = 'PutObject' "
+        f"AND element_at(requestParameters, 'bucketName') = {sql_quote(bucket)} "
+        f"AND element_at(requestParameters, 'key') = {sql_quote(key)} "
+        f"AND eventTime > '{start_time}' "
+        "ORDER BY eventTime DESC LIMIT 1"
+    )
+    
+    try:
+        query_id = cloudtrail.start_query(QueryStatement=query)['QueryId']
+        
+        # Poll with exponential backoff until the query completes
+        delay = 0.25
+        deadline = min(time.monotonic() + LAKE_QUERY_TIMEOUT, deadline)
+        while True:
+            response = cloudtrail.get_query_results(QueryId=query_id)
+            status = response.get('QueryStatus')
+            if status == 'FINISHED':
+                break
+            if status in ('FAILED', 'CANCELLED', 'TIMED_OUT'):
+                logger.error(f"CloudTrail Lake query {query_id} ended with status {status}")
+                return None
+            if time.monotonic() >= deadline:
+                logger.error(f"CloudTrail Lake query {query_id} did not finish in time")
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, 4)
+        
+        rows = response.get('QueryResultRows', [])
+        if not rows:
+            return None
+        
+        # Each row is a list of single-entry {column: value} dicts
+        row = {column: value for cell in rows[0] for column, value in cell.items()}
+        return build_uploader_info(
+            row.get('arn') or '',
+            row.get('username'),
+            row.get('type')
+        )
+        
+    except ClientError as e:
+        logger.error(f"Error querying CloudTrail Lake: {e}")
+        return None
+
+
+def get_uploader_info_from_metadata(bucket: str, key: str) -> Optional[dict]:
+    """
+    Read the uploader from the PDF's own object metadata, if the upload set it.
+    
+    Uploaders may stamp the object with x-amz-meta-uploaded-by (and optionally
+    x-amz-meta-uploaded-by-arn). One HeadObject call replaces the CloudTrail search.
+    The metadata is not authenticated, so this is only called when
+    TRUST_UPLOADER_METADATA is set. Must run before the PDF is deleted. Returns None if
+    the metadata is absent.
+    """
+    try:
+        metadata = s3.head_object(Bucket=bucket, Key=key).get('Metadata', {})
+    except ClientError as e:
+        logger.warning(f"Could not read metadata for s3://{bucket}/{key}: {e}")
+        return None
+    
+    username = metadata.get('uploaded-by')
+    if not username:
+        return None
+    
+    return build_uploader_info(metadata.get('uploaded-by-arn', ''), username, None)
+
+
+def get_uploader_info(bucket: str, key: str, now: datetime, deadline: float) -> dict:
     """
     Query CloudTrail to find who uploaded the PDF (PutObject event).
+    
+    Uses CloudTrail Lake when CLOUDTRAIL_EVENT_DATA_STORE is configured, falling back
+    to scanning recent LookupEvents results. The 90-day window ends at `now`, the
+    invocation's timestamp; `deadline` bounds the Lake query.
     """
+    if CLOUDTRAIL_EVENT_DATA_STORE:
+        uploader_info = get_uploader_info_from_lake(bucket, key, now, deadline)
+        if uploader_info:
+            return uploader_info
+    
     try:
-        # Look back up to 90 days for the upload event
+        # Look back up to 90 days for events on this object. LookupEvents accepts a single
+        # lookup attribute, so CloudTrail filters by the object ARN and the PutObject check
+        # is done here on the event summary, before parsing the full event JSON.
         response = cloudtrail.lookup_events(
             LookupAttributes=[
-                {'AttributeKey': 'EventName', 'AttributeValue': 'PutObject'},
+                {'AttributeKey': 'ResourceName', 'AttributeValue': f"arn:aws:s3:::{bucket}/{key}"},
             ],
-            StartTime=datetime.utcnow() - timedelta(days=90),
-            EndTime=datetime.utcnow(),
+            StartTime=now - timedelta(days=90),
+            EndTime=now,
             MaxResults=50
         )
         
         for event in response.get('Events', []):
-            cloud_trail_event = json.loads(event['CloudTrailEvent'])
-            request_params = cloud_trail_event.get('requestParameters', {})
+            if event.get('EventName') != 'PutObject':
+                continue
             
-            if (request_params.get('bucketName') == bucket and 
-                request_params.get('key') == key):
-                
-                user_identity = cloud_trail_event.get('userIdentity', {})
-                arn = user_identity.get('arn', '')
-                
-                username = 'unknown'
-                if '/' in arn:
-                    username = arn.split('/')[-1]
-                elif 'userName' in user_identity:
-                    username = user_identity['userName']
-                
-                return {
-                    'username': username,
-                    'arn': arn,
-                    'type': user_identity.get('type', 'unknown')
-                }
+            cloud_trail_event = orjson.loads(event['CloudTrailEvent'])
+            user_identity = cloud_trail_event.get('userIdentity', {})
+            return build_uploader_info(
+                user_identity.get('arn', ''),
+                user_identity.get('userName'),
+                user_identity.get('type')
+            )
         
         logger.warning(f"Could not find CloudTrail PutObject event for {bucket}/{key}")
         return {'username': 'unknown', 'arn': '', 'type': 'unknown'}
@@ -173,94 +408,119 @@ def get_uploader_info(bucket: str, key: str) -> dict:
         return {'username': 'unknown', 'arn': '', 'type': 'unknown'}
 
 
-def store_failure_record(
+def build_failure_record(
     pdf_key: str,
     temp_folder: str,
     temp_files_deleted: int,
     uploader_info: dict,
     failure_reason: str,
-    execution_arn: str
-):
-    """Store failure record in DynamoDB for daily digest."""
-    try:
-        table = dynamodb.Table(FAILURE_TABLE)
-        now = datetime.utcnow()
-        
-        table.put_item(
-            Item={
-                'failure_id': str(uuid.uuid4()),
-                'failure_date': now.strftime('%Y-%m-%d'),
-                'timestamp': now.isoformat() + 'Z',
-                'iam_username': uploader_info['username'],
-                'user_arn': uploader_info['arn'],
-                'pdf_key': pdf_key,
-                'temp_folder': temp_folder,
-                'temp_files_deleted': temp_files_deleted,
-                'failure_reason': failure_reason,
-                'execution_arn': execution_arn,
-                'notified': False
-            }
-        )
-        logger.info(f"Stored failure record for {pdf_key}")
-        
-    except ClientError as e:
-        logger.error(f"Error storing failure record: {e}")
+    execution_arn: str,
+    now: datetime
+) -> dict:
+    """
+    Build the failure record stored in DynamoDB for the daily digest.
+    
+    `now` is taken once per invocation so the record and its log entry agree.
+    failure_id is a ULID: 26 characters, unique, and sortable by creation time.
+    """
+    return {
+        'failure_id': str(ULID()),
+        'failure_date': now.strftime('%Y-%m-%d'),
+        'timestamp': now.isoformat() + 'Z',
+        'iam_username': uploader_info['username'],
+        'user_arn': uploader_info['arn'],
+        'pdf_key': pdf_key,
+        'temp_folder': temp_folder,
+        'temp_files_deleted': temp_files_deleted,
+        'failure_reason': failure_reason,
+        'execution_arn': execution_arn,
+        'notified': False,
+        # Only unnotified records carry pending_date, keeping pending_date-index sparse
+        'pending_date': now.strftime('%Y-%m-%d'),
+        # Epoch seconds; DynamoDB TTL deletes the record in the background after this
+        'ttl': int((now + timedelta(days=FAILURE_RECORD_TTL_DAYS)).replace(tzinfo=timezone.utc).timestamp())
+    }
 
 
-def log_cleanup_event(
-    pdf_key: str,
-    temp_folder: str,
-    temp_files_deleted: int,
-    uploader_info: dict,
-    failure_reason: str,
-    execution_arn: str
-):
-    """Log the cleanup event to CloudWatch."""
-    log_entry = {
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'event_type': 'PIPELINE_FAILURE_CLEANUP',
-        'execution_arn': execution_arn,
-        'failure_reason': failure_reason,
-        'deleted_pdf': pdf_key,
-        'deleted_temp_folder': temp_folder,
-        'temp_files_deleted': temp_files_deleted,
-        'uploaded_by': uploader_info['username'],
-        'uploaded_by_arn': uploader_info['arn']
+def serialize_failure_record(record: dict) -> dict:
+    """
+    Convert a failure record to DynamoDB's attribute-value format.
+    
+    The record schema is fixed and flat, so it is written out directly instead of
+    going through the resource layer's recursive TypeSerializer.
+    """
+    return {
+        'failure_id': {'S': record['failure_id']},
+        'failure_date': {'S': record['failure_date']},
+        'timestamp': {'S': record['timestamp']},
+        'iam_username': {'S': record['iam_username']},
+        'user_arn': {'S': record['user_arn']},
+        'pdf_key': {'S': record['pdf_key']},
+        'temp_folder': {'S': record['temp_folder']},
+        'temp_files_deleted': {'N': str(record['temp_files_deleted'])},
+        'failure_reason': {'S': record['failure_reason']},
+        'execution_arn': {'S': record['execution_arn']},
+        'notified': {'BOOL': record['notified']},
+        'pending_date': {'S': record['pending_date']},
+        'ttl': {'N': str(record['ttl'])}
     }
+
+
+def store_failure_records(records: list) -> set:
+    """
+    Store failure records in DynamoDB for daily digest.
     
-    # Log to Lambda's default CloudWatch stream (parsed as JSON automatically)
-    logger.info(json.dumps(log_entry))
+    Records are written with BatchWriteItem in groups of up to 25, resending any
+    unprocessed items with a short backoff. Returns the failure_ids of the records
+    that could not be written (empty when everything was stored).
+    """
+    put_requests = [{'PutRequest': {'Item': serialize_failure_record(record)}} for record in records]
+    unstored = set()
     
-    # Also log to dedicated cleanup log group
-    try:
-        log_stream_name = datetime.utcnow().strftime('%Y/%m/%d')
-        
+    for i in range(0, len(put_requests), 25):
+        pending = put_requests[i:i + 25]
+        attempt = 0
         try:
-            logs.create_log_stream(
-                logGroupName=LOG_GROUP_NAME,
-                logStreamName=log_stream_name
-            )
-        except logs.exceptions.ResourceAlreadyExistsException:
-            pass
-        
-        logs.put_log_events(
-            logGroupName=LOG_GROUP_NAME,
-            logStreamName=log_stream_name,
-            logEvents=[{
-                'timestamp': int(datetime.utcnow().timestamp() * 1000),
-                'message': json.dumps(log_entry)
-            }]
-        )
-        
-        logger.info(f"Logged cleanup event: {json.dumps(log_entry)}")
+            while pending:
+                if attempt:
+                    if attempt > 5:
+                        logger.error(f"Giving up on {len(pending)} unprocessed failure record(s)")
+                        break
+                    time.sleep(min(0.05 * (2 ** attempt), 1))
+                response = dynamodb_client.batch_write_item(RequestItems={FAILURE_TABLE: pending})
+                pending = response.get('UnprocessedItems', {}).get(FAILURE_TABLE, [])
+                attempt += 1
+        except ClientError as e:
+            logger.error(f"Error storing failure records: {e}")
         
-    except ClientError as e:
-        logger.error(f"Error logging to CloudWatch: {e}")
+        unstored.update(request['PutRequest']['Item']['failure_id']['S'] for request in pending)
+    
+    logger.info(f"Stored {len(records) - len(unstored)} of {len(records)} failure record(s)")
+    return unstored
 
 
-def handler(event, context):
+def log_cleanup_event(record: dict):
+    """Log the cleanup event to the Lambda's CloudWatch log group."""
+    log_entry = {
+        'timestamp': record['timestamp'],
+        'event_type': 'PIPELINE_FAILURE_CLEANUP',
+        'execution_arn': record['execution_arn'],
+        'failure_reason': record['failure_reason'],
+        'deleted_pdf': record['pdf_key'],
+        'deleted_temp_folder': record['temp_folder'],
+        'temp_files_deleted': record['temp_files_deleted'],
+        'uploaded_by': record['iam_username'],
+        'uploaded_by_arn': record['user_arn']
+    }
+    
+    # Log to Lambda's default CloudWatch stream (parsed as JSON automatically).
+    # orjson output is compact, which is the shape the dashboard queries parse.
+    logger.info(orjson.dumps(log_entry).decode())
+
+
+def process_failure_event(event: dict, now: datetime, deadline: float) -> Tuple[Optional[dict], str]:
     """
-    Lambda handler for Step Function failure events from EventBridge.
+    Clean up after one failed execution and build its failure record.
     
     Event structure:
     {
@@ -275,17 +535,19 @@ def handler(event, context):
             "cause": "..."
         }
     }
-    """
-    logger.info(f"Received event: {json.dumps(event)}")
     
+    Returns (failure_record, '') on success, or (None, reason) if the event does not
+    identify a PDF to clean up.
+    """
     detail = event.get('detail', {})
     execution_arn = detail.get('executionArn', 'unknown')
     status = detail.get('status', 'unknown')
+    logger.info("Received execution %s status=%s", execution_arn, status)
     
     # Parse the execution input
     try:
-        execution_input = json.loads(detail.get('input', '{}'))
-    except json.JSONDecodeError:
+        execution_input = orjson.loads(detail.get('input', '{}'))
+    except orjson.JSONDecodeError:
         logger.error("Failed to parse execution input")
         execution_input = {}
     
@@ -300,58 +562,134 @@ def handler(event, context):
     pdf_key = extract_pdf_key_from_execution(execution_input)
     if not pdf_key:
         logger.error("Could not determine PDF key from execution input")
-        return {'statusCode': 400, 'body': 'Could not determine PDF key'}
+        return None, 'Could not determine PDF key'
     
     # Get bucket name from execution input or environment
     bucket = execution_input.get('s3_bucket', BUCKET_NAME)
     if not bucket:
         logger.error("Could not determine S3 bucket")
-        return {'statusCode': 400, 'body': 'Could not determine S3 bucket'}
+        return None, 'Could not determine S3 bucket'
     
     logger.info(f"Processing failure cleanup for {pdf_key} in bucket {bucket}")
     
     # Get temp folder path
     temp_folder = get_temp_folder_path(pdf_key)
     
-    # Delete the original PDF
-    delete_s3_object(bucket, pdf_key)
+    # Read the uploader from the PDF's metadata (if trusted) while the object still exists
+    uploader_info = get_uploader_info_from_metadata(bucket, pdf_key) if TRUST_UPLOADER_METADATA else None
     
-    # Delete the temp folder
+    # Delete the temp folder, with the original PDF in its first batch
     temp_files_deleted = 0
     if temp_folder:
-        temp_files_deleted = delete_temp_folder(bucket, temp_folder)
+        temp_files_deleted = delete_temp_folder(bucket, temp_folder, pdf_key)
+    else:
+        delete_s3_object(bucket, pdf_key)
     
-    # Get uploader info from CloudTrail
-    uploader_info = get_uploader_info(bucket, pdf_key)
+    # Fall back to CloudTrail when the upload didn't record the uploader
+    if not uploader_info:
+        if RESOLVE_UPLOADER:
+            uploader_info = get_uploader_info(bucket, pdf_key, now, deadline)
+        else:
+            uploader_info = {'username': 'unknown', 'arn': '', 'type': 'unknown'}
     logger.info(f"PDF was uploaded by: {uploader_info['username']}")
     
-    # Store failure record for daily digest
-    store_failure_record(
+    record = build_failure_record(
         pdf_key=pdf_key,
         temp_folder=temp_folder or '',
         temp_files_deleted=temp_files_deleted,
         uploader_info=uploader_info,
         failure_reason=failure_reason,
-        execution_arn=execution_arn
+        execution_arn=execution_arn,
+        now=now
     )
+    return record, ''
+
+
+def handle_sqs_batch(messages: list, now: datetime, deadline: float) -> dict:
+    """
+    Process a batch of failure events delivered through SQS.
+    
+    Failure records for the whole batch are written together. Messages that could not be
+    processed are reported in batchItemFailures so SQS redelivers only those.
+    """
+    batch_item_failures = []
+    processed = []
+    
+    for message in messages:
+        message_id = message['messageId']
+        logger.debug("Received event: %s", message['body'])
+        
+        try:
+            event = orjson.loads(message['body'])
+        except orjson.JSONDecodeError:
+            # Redelivery can't fix a malformed message, so drop it instead of retrying
+            logger.error(f"Skipping message {message_id}: body is not valid JSON")
+            continue
+        
+        try:
+            record, error = process_failure_event(event, now, deadline)
+        except Exception as e:
+            logger.error(f"Error processing message {message_id}: {e}")
+            batch_item_failures.append({'itemIdentifier': message_id})
+            continue
+        
+        if record:
+            processed.append((message_id, record))
+        else:
+            logger.error(f"Skipping message {message_id}: {error}")
+    
+    if processed:
+        # Only messages whose records weren't written are redelivered; retrying stored
+        # ones would duplicate their records, and their PDFs are already gone
+        unstored = store_failure_records([record for _, record in processed])
+        for message_id, record in processed:
+            if record['failure_id'] in unstored:
+                batch_item_failures.append({'itemIdentifier': message_id})
+            else:
+                log_cleanup_event(record)
+    
+    logger.info(f"Processed {len(messages)} messages: {len(processed)} cleanups, {len(batch_item_failures)} failures")
+    
+    return {'batchItemFailures': batch_item_failures}
+
+
+def handler(event, context):
+    """
+    Lambda handler for Step Function failure events.
+    
+    Events normally arrive as SQS batches (each message body is the EventBridge event
+    described in process_failure_event). A single EventBridge event invoked directly
+    is also accepted.
+    """
+    now = datetime.utcnow()
+    # Shared by every event in the invocation, so one slow Lake query can't starve the rest
+    lake_deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - LAKE_TIME_RESERVE
+    
+    if 'Records' in event:
+        return handle_sqs_batch(event['Records'], now, lake_deadline)
+    
+    # The execution input can be tens of KB, so only serialize the event when debugging
+    if DEBUG:
+        logger.debug(f"Received event: {orjson.dumps(event).decode()}")
+    
+    record, error = process_failure_event(event, now, lake_deadline)
+    if not record:
+        return {'statusCode': 400, 'body': error}
+    
+    # Store failure record for daily digest
+    if store_failure_records([record]):
+        return {'statusCode': 500, 'body': f"Failed to store failure record for {record['pdf_key']}"}
     
     # Log the cleanup event
-    log_cleanup_event(
-        pdf_key=pdf_key,
-        temp_folder=temp_folder or '',
-        temp_files_deleted=temp_files_deleted,
-        uploader_info=uploader_info,
-        failure_reason=failure_reason,
-        execution_arn=execution_arn
-    )
+    log_cleanup_event(record)
     
-    logger.info(f"Cleanup complete for {pdf_key}: deleted PDF and {temp_files_deleted} temp files")
+    logger.info(f"Cleanup complete for {record['pdf_key']}: deleted PDF and {record['temp_files_deleted']} temp files")
     
     return {
         'statusCode': 200,
-        'body': json.dumps({
-            'pdf_deleted': pdf_key,
-            'temp_files_deleted': temp_files_deleted,
-            'uploaded_by': uploader_info['username']
-        })
+        'body': orjson.dumps({
+            'pdf_deleted': record['pdf_key'],
+            'temp_files_deleted': record['temp_files_deleted'],
+            'uploaded_by': record['iam_username']
+        }).decode()
     }
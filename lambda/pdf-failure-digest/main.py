@@ -11,24 +11,45 @@ Configuration via SSM Parameter Store:
 - /pdf-processing/sender-email: sender email address (if email enabled)
 """
 
+import gzip
 import json
 import os
+import re
 import boto3
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from collections import defaultdict
-from typing import Optional
+from functools import partial
+from html import escape
+from itertools import groupby
+from typing import Optional, Tuple
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-ses = boto3.client('ses')
-ssm = boto3.client('ssm')
-s3 = boto3.client('s3')
+# Shared client config: keep-alive connections reused across calls, a pool large enough
+# for concurrent notified updates, adaptive retries for throttling, and short timeouts
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    connect_timeout=3,
+    read_timeout=10,
+    tcp_keepalive=True
+)
+
+# Initialize AWS clients from one shared session
+session = boto3.session.Session()
+dynamodb = session.resource('dynamodb', config=AWS_CLIENT_CONFIG)
+dynamodb_client = session.client('dynamodb', config=AWS_CLIENT_CONFIG)
+ses = session.client('ses', config=AWS_CLIENT_CONFIG)
+ssm = session.client('ssm', config=AWS_CLIENT_CONFIG)
+s3 = session.client('s3', config=AWS_CLIENT_CONFIG)
 
 # Environment variables
 FAILURE_TABLE = os.environ.get('FAILURE_TABLE', 'pdf-failure-records')
@@ -37,19 +58,112 @@ SENDER_EMAIL_PARAM = os.environ.get('SENDER_EMAIL_PARAM', '/pdf-processing/sende
 EMAIL_ENABLED_PARAM = os.environ.get('EMAIL_ENABLED_PARAM', '/pdf-processing/email-enabled')
 BUCKET_NAME = os.environ.get('BUCKET_NAME', '')
 
-# Cache for SSM parameters (avoid repeated calls within same invocation)
+# Failure records are read and updated through the low-level client (the hot paths);
+# one deserializer converts the typed attribute values of every queried item
+_deserializer = TypeDeserializer()
+
+# Table handle built once per container so warm invocations reuse it
+notification_table = dynamodb.Table(NOTIFICATION_TABLE)
+
+# Concurrent update_item calls when marking failures as notified
+NOTIFY_WORKERS = 16
+
+# Users whose digests are delivered concurrently; sends are paced to the SES send rate
+DELIVERY_WORKERS = 10
+
+# SES send pacing shared by the delivery workers: the account's MaxSendRate (emails per
+# second, looked up once per container) and the earliest time the next send may start
+_max_send_rate = None
+_next_send_time = 0.0
+_send_lock = threading.Lock()
+
+# Fields pulled out of the ECS task description embedded in States.TaskFailed causes
+_STOPPED_REASON_RE = re.compile(r'"StoppedReason":"([^"]*)"')
+_CONTAINER_NAME_RE = re.compile(r'"Name":"([^"]*)"')
+_EXIT_CODE_RE = re.compile(r'"ExitCode":(-?\d+)')
+
+# Step Functions error names with a fixed description, in the order they are checked
+_KNOWN_ERRORS = {
+    "States.Timeout": "Task timed out",
+    "Lambda.ServiceException": "Lambda service error",
+    "Lambda.AWSLambdaException": "Lambda execution error",
+}
+
+# Report and email shells, shared by every user; only the fields in braces vary
+_TEXT_TEMPLATE = """PDF Processing Failure Summary
+==============================
+
+Date: {date}
+User: {username}
+
+The following PDFs failed processing and have been automatically cleaned up:
+{failure_entries}
+
+Total failures today: {total}
+
+To retry processing, please re-upload the original PDF files to the appropriate folder.
+
+This is an automated report.
+"""
+
+_HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+    <h2 style="color: #d32f2f;">PDF Processing Failure Summary</h2>
+    
+    <table style="width: 100%; margin-bottom: 20px;">
+        <tr>
+            <td style="padding: 8px; background: #f5f5f5;"><strong>Date:</strong></td>
+            <td style="padding: 8px;">{date}</td>
+        </tr>
+        <tr>
+            <td style="padding: 8px; background: #f5f5f5;"><strong>User:</strong></td>
+            <td style="padding: 8px;">{username}</td>
+        </tr>
+        <tr>
+            <td style="padding: 8px; background: #f5f5f5;"><strong>Total Failures:</strong></td>
+            <td style="padding: 8px;">{total}</td>
+        </tr>
+    </table>
+    
+    <p>The following PDFs failed processing and have been automatically cleaned up:</p>
+    
+    <table style="width: 100%; border-collapse: collapse;">
+        {failure_entries_html}
+    </table>
+    
+    <p style="margin-top: 20px; padding: 15px; background: #fff3e0; border-left: 4px solid #ff9800;">
+        <strong>To retry processing:</strong> Please re-upload the original PDF files to the appropriate folder.
+    </p>
+    
+    <p style="color: #666; font-size: 12px; margin-top: 30px; border-top: 1px solid #eee; padding-top: 15px;">
+        This is an automated notification from the PDF Accessibility Processing Pipeline.
+    </p>
+</body>
+</html>
+"""
+
+# Cache for SSM parameters: {name: (value, fetched_at)}. Module-level, so it survives
+# across warm invocations; entries are refreshed after SSM_CACHE_TTL_SECONDS.
+SSM_CACHE_TTL_SECONDS = 300
 _ssm_cache = {}
 
 
 def get_ssm_parameter(param_name: str, default: str = None) -> Optional[str]:
-    """Get parameter from SSM Parameter Store (cached)."""
-    if param_name in _ssm_cache:
-        return _ssm_cache[param_name]
+    """Get parameter from SSM Parameter Store (cached for SSM_CACHE_TTL_SECONDS)."""
+    now = time.monotonic()
+    cached = _ssm_cache.get(param_name)
+    if cached and now - cached[1] < SSM_CACHE_TTL_SECONDS:
+        return cached[0]
     
     try:
         response = ssm.get_parameter(Name=param_name)
         value = response['Parameter']['Value']
-        _ssm_cache[param_name] = value
+        _ssm_cache[param_name] = (value, now)
         logger.info(f"Loaded SSM parameter {param_name}: {value}")
         return value
     except ClientError as e:
@@ -71,23 +185,64 @@ def get_sender_email() -> str:
     return get_ssm_parameter(SENDER_EMAIL_PARAM, 'sender-email-not-configured@example.com')
 
 
-def get_todays_failures() -> list:
-    """Query DynamoDB for all failures from today that haven't been notified."""
-    table = dynamodb.Table(FAILURE_TABLE)
-    today = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+def query_failures(query_kwargs: dict) -> list:
+    """
+    Run a failure-table query, following LastEvaluatedKey so results over 1 MB are read
+    in full, and deserialize the projected attributes directly.
+    """
+    failures = []
+    while True:
+        response = dynamodb_client.query(**query_kwargs)
+        failures.extend(
+            {name: _deserializer.deserialize(value) for name, value in item.items()}
+            for item in response.get('Items', [])
+        )
+        if 'LastEvaluatedKey' not in response:
+            return failures
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def get_todays_failures(today: str) -> list:
+    """
+    Query DynamoDB for all failures from today (YYYY-MM-DD) that haven't been notified.
+    
+    pending_date-index is sparse: only unnotified records carry pending_date, so the
+    query reads (and is billed for) just the records the digest still has to send.
+    Its sort key is iam_username, so the failures come back grouped by user.
+    Projects only the attributes the digest uses. Uses the low-level client.
+    
+    Records written before pending_date existed are not in that index, so today's
+    unnotified records without it are also read from failure_date-index and merged in.
+    """
+    projection = 'failure_id, iam_username, pdf_key, failure_reason, temp_files_deleted, #ts'
     
     try:
-        response = table.query(
-            IndexName='failure_date-index',
-            KeyConditionExpression='failure_date = :date',
-            FilterExpression='notified = :notified',
-            ExpressionAttributeValues={
-                ':date': today,
-                ':notified': False
-            }
-        )
+        failures = query_failures({
+            'TableName': FAILURE_TABLE,
+            'IndexName': 'pending_date-index',
+            'KeyConditionExpression': 'pending_date = :date',
+            'ScanIndexForward': True,
+            'ProjectionExpression': projection,
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+            'ExpressionAttributeValues': {':date': {'S': today}}
+        })
+        
+        # Unnotified records from a cleanup Lambda that predates pending_date-index.
+        # This reads all of today's records, so it can go once no such deployment remains.
+        legacy_failures = query_failures({
+            'TableName': FAILURE_TABLE,
+            'IndexName': 'failure_date-index',
+            'KeyConditionExpression': 'failure_date = :date',
+            'FilterExpression': 'notified = :false AND attribute_not_exists(pending_date)',
+            'ProjectionExpression': projection,
+            'ExpressionAttributeNames': {'#ts': 'timestamp'},
+            'ExpressionAttributeValues': {':date': {'S': today}, ':false': {'BOOL': False}}
+        })
+        if legacy_failures:
+            logger.info(f"Found {len(legacy_failures)} unnotified failures without pending_date")
+            failures.extend(legacy_failures)
+            failures.sort(key=lambda f: f.get('iam_username', 'unknown'))
         
-        failures = response.get('Items', [])
         logger.info(f"Found {len(failures)} unnotified failures for {today}")
         return failures
         
@@ -96,111 +251,163 @@ def get_todays_failures() -> list:
         return []
 
 
-def get_user_email(username: str) -> Optional[str]:
+def get_notification_preferences(usernames) -> dict:
     """
-    Look up user's email from notification preferences table.
-    Falls back to 'default' user if specific user not found.
+    Load notification preferences for the given users plus the 'default' entry.
+    
+    Uses batch_get_item (up to 100 keys per call) instead of one get_item per user,
+    retrying any unprocessed keys. Returns {iam_username: item} for users that exist.
     """
+    keys = [{'iam_username': username} for username in set(usernames) | {'default'}
+            if username and username != 'unknown']
+    preferences = {}
+    
     try:
-        table = dynamodb.Table(NOTIFICATION_TABLE)
-        
-        # First try the specific user
-        if username and username != 'unknown':
-            response = table.get_item(Key={'iam_username': username})
-            
-            if 'Item' in response:
-                item = response['Item']
-                if item.get('enabled', False):
-                    return item.get('email')
-                else:
-                    logger.info(f"Notifications disabled for user: {username}")
-        
-        # Fall back to 'default' user (receives all unmatched notifications)
-        response = table.get_item(Key={'iam_username': 'default'})
-        
-        if 'Item' in response:
-            item = response['Item']
+        for i in range(0, len(keys), 100):
+            request_items = {NOTIFICATION_TABLE: {'Keys': keys[i:i + 100]}}
+            attempt = 0
+            while request_items:
+                if attempt:
+                    if attempt > 5:
+                        logger.error(f"Giving up on {len(request_items[NOTIFICATION_TABLE]['Keys'])} unprocessed preference lookups")
+                        break
+                    time.sleep(min(0.05 * (2 ** attempt), 1))
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get('Responses', {}).get(NOTIFICATION_TABLE, []):
+                    preferences[item['iam_username']] = item
+                request_items = response.get('UnprocessedKeys')
+                attempt += 1
+    except ClientError as e:
+        logger.error(f"Error looking up notification preferences: {e}")
+    
+    return preferences
+
+
+def get_user_email(username: str, preferences: dict) -> Optional[str]:
+    """
+    Look up user's email in the preferences loaded by get_notification_preferences.
+    Falls back to 'default' user if specific user not found.
+    """
+    # First try the specific user
+    if username and username != 'unknown':
+        item = preferences.get(username)
+        if item:
             if item.get('enabled', False):
-                logger.info(f"Using default recipient for user: {username}")
                 return item.get('email')
-        
-        logger.info(f"No notification config for user: {username} (and no default)")
-        return None
-        
+            else:
+                logger.info(f"Notifications disabled for user: {username}")
+    
+    # Fall back to 'default' user (receives all unmatched notifications)
+    item = preferences.get('default')
+    if item and item.get('enabled', False):
+        logger.info(f"Using default recipient for user: {username}")
+        return item.get('email')
+    
+    logger.info(f"No notification config for user: {username} (and no default)")
+    return None
+
+
+def mark_failure_notified(failure_id: str):
+    """
+    Mark a single failure record as notified (and drop it from pending_date-index).
+    
+    The update is conditional on the record still existing, so a record that expired
+    (TTL) or was removed after the query is not recreated as a stub holding only
+    failure_id and notified.
+    """
+    try:
+        dynamodb_client.update_item(
+            TableName=FAILURE_TABLE,
+            Key={'failure_id': {'S': failure_id}},
+            UpdateExpression='SET notified = :notified REMOVE pending_date',
+            ConditionExpression='attribute_exists(failure_id)',
+            ExpressionAttributeValues={':notified': {'BOOL': True}}
+        )
     except ClientError as e:
-        logger.error(f"Error looking up user email: {e}")
-        return None
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            logger.info(f"Failure record {failure_id} no longer exists, nothing to mark")
+            return
+        logger.error(f"Error marking {failure_id} as notified: {e}")
 
 
-def mark_as_notified(failure_ids: list):
-    """Mark failure records as notified."""
-    table = dynamodb.Table(FAILURE_TABLE)
+def mark_as_notified(failure_ids: list, executor: ThreadPoolExecutor):
+    """
+    Mark failure records as notified.
     
+    Each record is a separate update_item round-trip, so the updates are queued on
+    the shared notify executor rather than issued one after another; the caller waits
+    for them by shutting the executor down.
+    """
     for failure_id in failure_ids:
-        try:
-            table.update_item(
-                Key={'failure_id': failure_id},
-                UpdateExpression='SET notified = :notified',
-                ExpressionAttributeValues={':notified': True}
-            )
-        except ClientError as e:
-            logger.error(f"Error marking {failure_id} as notified: {e}")
+        executor.submit(mark_failure_notified, failure_id)
 
 
 def strip_srv_prefix(username: str) -> str:
-    """Remove 'srv-' prefix from username if present."""
-    if username and username.lower().startswith('srv-'):
+    """Remove 'srv-' prefix (any case) from username if present."""
+    if username and username[:4].lower() == 'srv-':
         return username[4:]
     return username or 'unknown'
 
 
+def describe_task_failure(failure_reason: str) -> str:
+    """
+    Summarize a States.TaskFailed reason from the ECS task description in its cause.
+    
+    The cause is normally the task description as JSON, which is parsed in one pass;
+    truncated or otherwise malformed causes fall back to scanning for the fields.
+    """
+    try:
+        task = json.loads(failure_reason.partition(':')[2])
+    except ValueError:
+        task = None
+    
+    if isinstance(task, dict):
+        containers = [c for c in task.get('Containers') or [] if isinstance(c, dict)]
+        if task.get('StoppedReason'):
+            container_name = containers[0].get('Name', 'unknown container') if containers else 'unknown container'
+            return f"ECS Task Failed ({container_name}): {task['StoppedReason']}"
+        # Containers that never started report "ExitCode": null
+        for container in containers:
+            if container.get('ExitCode') is not None:
+                return f"ECS Task Failed with exit code {container['ExitCode']}"
+        return "ECS Task Failed"
+    
+    # Try to extract the stopped reason from ECS task failure
+    stopped_match = _STOPPED_REASON_RE.search(failure_reason)
+    if stopped_match:
+        # Also try to get the container name
+        name_match = _CONTAINER_NAME_RE.search(failure_reason)
+        container_name = name_match.group(1) if name_match else "unknown container"
+        return f"ECS Task Failed ({container_name}): {stopped_match.group(1)}"
+    
+    # Try to get exit code
+    exit_code_match = _EXIT_CODE_RE.search(failure_reason)
+    if exit_code_match:
+        return f"ECS Task Failed with exit code {exit_code_match.group(1)}"
+    
+    return "ECS Task Failed"
+
+
 def extract_clean_failure_reason(failure_reason: str) -> str:
     """Extract a clean, human-readable failure reason from the raw error."""
     if not failure_reason:
         return "Unknown error"
     
-    # Check for common failure patterns
-    if "States.TaskFailed" in failure_reason:
-        # Try to extract the stopped reason from ECS task failure
-        if '"StoppedReason":"' in failure_reason:
-            try:
-                start = failure_reason.index('"StoppedReason":"') + len('"StoppedReason":"')
-                end = failure_reason.index('"', start)
-                stopped_reason = failure_reason[start:end]
-                
-                # Also try to get the container name
-                container_name = "unknown container"
-                if '"Name":"' in failure_reason:
-                    name_start = failure_reason.index('"Name":"') + len('"Name":"')
-                    name_end = failure_reason.index('"', name_start)
-                    container_name = failure_reason[name_start:name_end]
-                
-                return f"ECS Task Failed ({container_name}): {stopped_reason}"
-            except (ValueError, IndexError):
-                pass
-        
-        # Try to get exit code
-        if '"ExitCode":' in failure_reason:
-            try:
-                start = failure_reason.index('"ExitCode":') + len('"ExitCode":')
-                end = start
-                while end < len(failure_reason) and (failure_reason[end].isdigit() or failure_reason[end] == '-'):
-                    end += 1
-                exit_code = failure_reason[start:end]
-                return f"ECS Task Failed with exit code {exit_code}"
-            except (ValueError, IndexError):
-                pass
-        
-        return "ECS Task Failed"
+    # Reasons are stored as "<Error>: <cause>", so the leading error name usually
+    # classifies the failure without scanning the (often multi-KB) cause
+    error_name = failure_reason.partition(':')[0]
+    if error_name == "States.TaskFailed":
+        return describe_task_failure(failure_reason)
+    if error_name in _KNOWN_ERRORS:
+        return _KNOWN_ERRORS[error_name]
     
-    if "States.Timeout" in failure_reason:
-        return "Task timed out"
-    
-    if "Lambda.ServiceException" in failure_reason:
-        return "Lambda service error"
+    # Otherwise check for common failure patterns anywhere in the message
+    if "States.TaskFailed" in failure_reason:
+        return describe_task_failure(failure_reason)
     
-    if "Lambda.AWSLambdaException" in failure_reason:
-        return "Lambda execution error"
+    for error_name, description in _KNOWN_ERRORS.items():
+        if error_name in failure_reason:
+            return description
     
     # If it's a short message, return as-is
     if len(failure_reason) < 100:
@@ -210,11 +417,9 @@ def extract_clean_failure_reason(failure_reason: str) -> str:
     return failure_reason[:100] + "..."
 
 
-def format_failure_entry(failure: dict, index: int) -> str:
+def format_failure_entry(failure: dict, index: int, filename: str, clean_reason: str) -> str:
     """Format a single failure entry for the report."""
     pdf_key = failure.get('pdf_key', 'unknown')
-    filename = pdf_key.split('/')[-1] if pdf_key else 'unknown'
-    clean_reason = extract_clean_failure_reason(failure.get('failure_reason', ''))
     
     return f"""
 {index}. {filename}
@@ -225,74 +430,84 @@ def format_failure_entry(failure: dict, index: int) -> str:
 """
 
 
-def format_failure_entry_html(failure: dict, index: int) -> str:
-    """Format a single failure entry for HTML email."""
+def format_failure_entry_html(failure: dict, index: int, filename: str, clean_reason: str) -> str:
+    """Format a single failure entry for HTML email (text fields are HTML-escaped)."""
     pdf_key = failure.get('pdf_key', 'unknown')
-    filename = pdf_key.split('/')[-1] if pdf_key else 'unknown'
-    clean_reason = extract_clean_failure_reason(failure.get('failure_reason', ''))
     
     return f"""
     <tr>
         <td style="padding: 10px; border-bottom: 1px solid #eee;">
-            <strong>{index}. {filename}</strong><br>
+            <strong>{index}. {escape(filename)}</strong><br>
             <span style="color: #666; font-size: 12px;">
-                Location: <code>{pdf_key}</code><br>
-                Reason: {clean_reason}<br>
+                Location: <code>{escape(pdf_key)}</code><br>
+                Reason: {escape(clean_reason)}<br>
                 Temp files deleted: {failure.get('temp_files_deleted', 0)}<br>
-                Failed at: {failure.get('timestamp', 'Unknown')}
+                Failed at: {escape(str(failure.get('timestamp', 'Unknown')))}
             </span>
         </td>
     </tr>
 """
 
 
-def generate_report_text(username: str, failures: list, date: str) -> str:
-    """Generate plain text report content."""
-    failure_entries = ""
+def prepare_entries(failures: list, include_html: bool = True) -> Tuple[str, str]:
+    """
+    Render the text (and optionally HTML) entries for all failures in one pass.
+    
+    Each failure's filename and clean reason are derived once and shared by both forms.
+    Returns (text_entries, html_entries); html_entries is '' when include_html is False.
+    """
+    text_entries = []
+    html_entries = []
+    
     for i, failure in enumerate(failures, 1):
-        failure_entries += format_failure_entry(failure, i)
+        pdf_key = failure.get('pdf_key', 'unknown')
+        filename = pdf_key.rsplit('/', 1)[-1] if pdf_key else 'unknown'
+        clean_reason = extract_clean_failure_reason(failure.get('failure_reason', ''))
+        
+        text_entries.append(format_failure_entry(failure, i, filename, clean_reason))
+        if include_html:
+            html_entries.append(format_failure_entry_html(failure, i, filename, clean_reason))
     
-    return f"""PDF Processing Failure Summary
-==============================
+    return ''.join(text_entries), ''.join(html_entries)
 
-Date: {date}
-User: {username}
-
-The following PDFs failed processing and have been automatically cleaned up:
-{failure_entries}
-
-Total failures today: {len(failures)}
-
-To retry processing, please re-upload the original PDF files to the appropriate folder.
 
-This is an automated report.
-"""
+def generate_report_text(username: str, failures: list, date: str, failure_entries: Optional[str] = None) -> str:
+    """Generate plain text report content (from pre-rendered entries, if given)."""
+    if failure_entries is None:
+        failure_entries, _ = prepare_entries(failures, include_html=False)
+    
+    return _TEXT_TEMPLATE.format(
+        date=date,
+        username=username,
+        failure_entries=failure_entries,
+        total=len(failures)
+    )
 
 
-def save_report_to_s3(username: str, failures: list, date: str) -> bool:
-    """Save failure report to S3 as a text file."""
+def save_report_to_s3(username: str, report_content: str, timestamp: str) -> bool:
+    """
+    Save a rendered failure report to S3 as a gzip-compressed text file.
+    
+    Reports repeat the same boilerplate per entry, so gzip shrinks them several-fold.
+    The object is stored with Content-Encoding: gzip, so HTTP clients decompress it on
+    download; the .txt.gz name tells the CLI and console users what they're getting.
+    """
     # Strip 'srv-' prefix from username
     clean_username = strip_srv_prefix(username)
     
-    # Generate timestamp for filename: yyyyMMdd-HHmm
-    now = datetime.now(timezone.utc)
-    timestamp = now.strftime('%Y%m%d-%H%M')
-    
-    # Build filename: username-yyyyMMdd-HHmm.txt
-    filename = f"{clean_username}-{timestamp}.txt"
+    # Build filename: username-yyyyMMdd-HHmm.txt.gz
+    filename = f"{clean_username}-{timestamp}.txt.gz"
     
     # Build S3 key: reports/deletion_reports/username/filename
     s3_key = f"reports/deletion_reports/{clean_username}/{filename}"
     
-    # Generate report content
-    report_content = generate_report_text(username, failures, date)
-    
     try:
         s3.put_object(
             Bucket=BUCKET_NAME,
             Key=s3_key,
-            Body=report_content.encode('utf-8'),
-            ContentType='text/plain'
+            Body=gzip.compress(report_content.encode('utf-8'), compresslevel=6),
+            ContentType='text/plain; charset=utf-8',
+            ContentEncoding='gzip'
         )
         logger.info(f"Saved report to s3://{BUCKET_NAME}/{s3_key}")
         return True
@@ -302,63 +517,29 @@ def save_report_to_s3(username: str, failures: list, date: str) -> bool:
         return False
 
 
-def send_digest_email(recipient: str, username: str, failures: list, date: str) -> bool:
-    """Send digest email to user with all their failures."""
-    
-    # Build text version
-    body_text = generate_report_text(username, failures, date)
-
-    # Build HTML version
-    failure_entries_html = ""
-    for i, failure in enumerate(failures, 1):
-        failure_entries_html += format_failure_entry_html(failure, i)
-    
-    body_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-</head>
-<body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-    <h2 style="color: #d32f2f;">PDF Processing Failure Summary</h2>
-    
-    <table style="width: 100%; margin-bottom: 20px;">
-        <tr>
-            <td style="padding: 8px; background: #f5f5f5;"><strong>Date:</strong></td>
-            <td style="padding: 8px;">{date}</td>
-        </tr>
-        <tr>
-            <td style="padding: 8px; background: #f5f5f5;"><strong>User:</strong></td>
-            <td style="padding: 8px;">{username}</td>
-        </tr>
-        <tr>
-            <td style="padding: 8px; background: #f5f5f5;"><strong>Total Failures:</strong></td>
-            <td style="padding: 8px;">{len(failures)}</td>
-        </tr>
-    </table>
-    
-    <p>The following PDFs failed processing and have been automatically cleaned up:</p>
-    
-    <table style="width: 100%; border-collapse: collapse;">
-        {failure_entries_html}
-    </table>
-    
-    <p style="margin-top: 20px; padding: 15px; background: #fff3e0; border-left: 4px solid #ff9800;">
-        <strong>To retry processing:</strong> Please re-upload the original PDF files to the appropriate folder.
-    </p>
-    
-    <p style="color: #666; font-size: 12px; margin-top: 30px; border-top: 1px solid #eee; padding-top: 15px;">
-        This is an automated notification from the PDF Accessibility Processing Pipeline.
-    </p>
-</body>
-</html>
-"""
+def send_digest_email(
+    sender: str,
+    recipient: str,
+    username: str,
+    failures: list,
+    date: str,
+    body_text: str,
+    failure_entries_html: str
+) -> bool:
+    """Send digest email to user with all their failures (text body already rendered)."""
+    body_html = _HTML_TEMPLATE.format(
+        date=date,
+        username=escape(username),
+        total=len(failures),
+        failure_entries_html=failure_entries_html
+    )
 
     subject = f"PDF Processing Failures - Daily Summary for {date}"
     
     try:
+        wait_for_send_slot()
         ses.send_email(
-            Source=get_sender_email(),
+            Source=sender,
             Destination={'ToAddresses': [recipient]},
             Message={
                 'Subject': {'Data': subject, 'Charset': 'UTF-8'},
@@ -376,6 +557,70 @@ def send_digest_email(recipient: str, username: str, failures: list, date: str)
         return False
 
 
+def get_max_send_rate() -> float:
+    """Get the account's SES maximum send rate (cached; 1/s if it can't be read)."""
+    global _max_send_rate
+    if _max_send_rate is None:
+        try:
+            _max_send_rate = float(ses.get_send_quota()['MaxSendRate']) or 1.0
+        except ClientError as e:
+            logger.warning(f"Could not read SES send quota, assuming 1 email/second: {e}")
+            _max_send_rate = 1.0
+        logger.info(f"SES max send rate: {_max_send_rate}/s")
+    return _max_send_rate
+
+
+def wait_for_send_slot():
+    """
+    Block until this thread may send another email without exceeding the SES send rate.
+    
+    Slots are handed out 1/MaxSendRate seconds apart across all delivery workers.
+    Throttling errors that still occur are retried by the client's adaptive retry mode.
+    """
+    global _next_send_time
+    interval = 1.0 / get_max_send_rate()
+    
+    with _send_lock:
+        slot = max(time.monotonic(), _next_send_time)
+        _next_send_time = slot + interval
+    
+    delay = slot - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def deliver_user_digest(
+    username: str,
+    user_failures: list,
+    sender: Optional[str],
+    preferences: dict,
+    date: str,
+    timestamp: str
+) -> Optional[str]:
+    """
+    Deliver one user's digest by email, or as an S3 report.
+    
+    The text report is rendered once and used as the email's Text part or as the
+    S3 report; HTML entries are only rendered when there is a recipient to send to.
+    Email is sent from sender, which is None when the email feature is disabled.
+    Returns 'email' or 's3' for the delivery that succeeded, or None if it failed.
+    """
+    email = get_user_email(username, preferences) if sender else None
+    if sender and not email:
+        logger.warning(f"No email configured for user {username}, falling back to S3 report")
+    
+    # Render text and HTML entries together, then the text report shared by both paths
+    failure_entries_text, failure_entries_html = prepare_entries(user_failures, include_html=bool(email))
+    body_text = generate_report_text(username, user_failures, date, failure_entries_text)
+    
+    if email:
+        sent = send_digest_email(sender, email, username, user_failures, date, body_text, failure_entries_html)
+        return 'email' if sent else None
+    
+    # Save to S3 (also the fallback if no email configured)
+    return 's3' if save_report_to_s3(username, body_text, timestamp) else None
+
+
 def handler(event, context):
     """
     Lambda handler for daily digest.
@@ -384,76 +629,78 @@ def handler(event, context):
     If email is enabled (SSM: /pdf-processing/email-enabled = "true"):
         - Sends email to users
     If email is disabled:
-        - Saves report to S3: reports/deletion_reports/{username}/{username}-{timestamp}.txt
+        - Saves report to S3: reports/deletion_reports/{username}/{username}-{timestamp}.txt.gz
     """
     logger.info("Starting daily failure digest processing")
     
     # Check if email is enabled
     email_enabled = is_email_enabled()
     logger.info(f"Email feature enabled: {email_enabled}")
-    
-    # Get today's date for the report
-    today = datetime.now(timezone.utc).strftime('%B %d, %Y')
+
+    # Without email or a report bucket there is nowhere to deliver to, so skip the query
+    # and leave the failures pending for a run that can deliver them
+    if not email_enabled and not BUCKET_NAME:
+        logger.warning("Email is disabled and BUCKET_NAME is not set; no digest can be delivered")
+        return {'statusCode': 200, 'body': 'Digest delivery disabled'}
+
+    # One clock reading per run, so the query date, report date and S3 report names
+    # can't disagree when the run straddles midnight
+    now = datetime.now(timezone.utc)
+    today = now.strftime('%B %d, %Y')
+    timestamp = now.strftime('%Y%m%d-%H%M')
     
     # Get all unnotified failures from today
-    failures = get_todays_failures()
+    failures = get_todays_failures(now.strftime('%Y-%m-%d'))
     
     if not failures:
         logger.info("No failures to process today")
         return {'statusCode': 200, 'body': 'No failures to process'}
     
-    # Group failures by username
-    failures_by_user = defaultdict(list)
-    for failure in failures:
-        username = failure.get('iam_username', 'unknown')
-        failures_by_user[username].append(failure)
+    # Group failures by username (the query returns them sorted by iam_username)
+    failures_by_user = {
+        username: list(user_failures)
+        for username, user_failures in groupby(failures, key=lambda f: f.get('iam_username', 'unknown'))
+    }
     
     logger.info(f"Processing failures for {len(failures_by_user)} users")
     
-    # Process each user
-    reports_generated = 0
-    emails_sent = 0
-    failure_ids_notified = []
-    
-    for username, user_failures in failures_by_user.items():
-        success = False
-        
-        if email_enabled:
-            # Try to send email
-            email = get_user_email(username)
-            if email:
-                success = send_digest_email(email, username, user_failures, today)
-                if success:
-                    emails_sent += 1
-            else:
-                logger.warning(f"No email configured for user {username}, falling back to S3 report")
-                # Fall back to S3 if no email configured
-                success = save_report_to_s3(username, user_failures, today)
-                if success:
-                    reports_generated += 1
-        else:
-            # Save to S3
-            success = save_report_to_s3(username, user_failures, today)
-            if success:
-                reports_generated += 1
-        
-        # Mark as notified regardless of delivery method
-        if success:
-            for f in user_failures:
-                failure_ids_notified.append(f['failure_id'])
+    # Load every user's notification preferences up front in batched reads, and the
+    # sender address once for all of this run's emails
+    preferences = get_notification_preferences(failures_by_user) if email_enabled else {}
+    sender = get_sender_email() if email_enabled else None
+    
+    # Deliver each user's digest concurrently; each delivery is an independent SES or S3 call.
+    # As soon as a user's digest is delivered their failures are marked notified, so those
+    # updates overlap with the remaining users' sends instead of waiting for all of them.
+    deliver = partial(deliver_user_digest, sender=sender, preferences=preferences,
+                      date=today, timestamp=timestamp)
+    results = []
+    failures_notified = 0
+    with ThreadPoolExecutor(max_workers=NOTIFY_WORKERS) as notify_executor:
+        with ThreadPoolExecutor(max_workers=DELIVERY_WORKERS) as executor:
+            futures = {
+                executor.submit(deliver, username, user_failures): user_failures
+                for username, user_failures in failures_by_user.items()
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                # Failures count as notified regardless of delivery method
+                if result:
+                    mark_as_notified([f['failure_id'] for f in futures[future]], notify_executor)
+                    failures_notified += len(futures[future])
     
-    # Mark all processed failures as notified
-    if failure_ids_notified:
-        mark_as_notified(failure_ids_notified)
+    emails_sent = results.count('email')
+    reports_generated = results.count('s3')
     
-    logger.info(f"Digest complete: {emails_sent} emails sent, {reports_generated} S3 reports, {len(failure_ids_notified)} failures processed")
+    logger.info(f"Digest complete: {emails_sent} emails sent, {reports_generated} S3 reports, {failures_notified} failures processed")
     
     return {
         'statusCode': 200,
         'body': json.dumps({
             'emails_sent': emails_sent,
             'reports_generated': reports_generated,
-            'failures_processed': len(failure_ids_notified),
+            'failures_processed': failures_notified,
             'users_processed': len(failures_by_user)
         })
     }
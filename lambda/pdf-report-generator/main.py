@@ -12,63 +12,159 @@ The report includes:
 import os
 import io
 import json
+import re
+import tempfile
 import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from itertools import chain
 from zoneinfo import ZoneInfo
-from typing import Dict, List, Optional, Any
+from typing import IO, Dict, List, Optional, Any, Set, Tuple
+from botocore.config import Config
 from pypdf import PdfReader
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 
 
-# Initialize S3 client
-s3_client = boto3.client('s3')
+# Shared client config: a connection pool large enough for the concurrent row builders,
+# and adaptive retries so S3 throttling under that concurrency is retried
+AWS_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={'mode': 'adaptive', 'max_attempts': 5}
+)
+
+# Initialize S3 client (thread-safe, shared by all row builders)
+s3_client = boto3.client('s3', config=AWS_CLIENT_CONFIG)
+
+# Report rows built concurrently; each row is several S3 round-trips
+ROW_WORKERS = 16
+
+# Each row's page count and report fetches run in parallel on this module-level pool.
+# It is separate from the row pool: rows block on these futures, so sharing it could deadlock.
+FETCH_WORKERS = ROW_WORKERS * 3
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+
+# Whether to read each result PDF to fill the page-count column. File size comes from
+# the listing either way; with this off a row needs only the JSON report fetches.
+INCLUDE_PAGE_COUNT = os.environ.get('INCLUDE_PAGE_COUNT', 'true').lower() == 'true'
+
+# Cap on the temp/ listing that replaces per-row report GETs. Past this many pages (1,000
+# keys each) the listing costs more than the 404s it saves and holds back every row, so
+# it is abandoned and each row fetches its reports directly.
+REPORT_LISTING_MAX_PAGES = 10
+
+# Block size for ranged reads of result PDFs when counting pages; a PDF no larger than
+# this is fetched in a single GET
+RANGE_BLOCK_SIZE = 256 * 1024
+
+# result/<folder path>/[COMPLIANT_]<original filename>, where the folder path is optional
+_RESULT_KEY_RE = re.compile(r'(?:result/)?(?:(.*)/)?(?:COMPLIANT_)?([^/]*)')
 
 # Version marker to force Lambda updates
 VERSION = "2.0.0-excel"
 
 
-def get_pdf_page_count(bucket: str, key: str) -> int:
+class S3RangeReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over an S3 object.
+    
+    The object is fetched lazily in RANGE_BLOCK_SIZE blocks with ranged GETs and each
+    block is kept once read, so a parser that seeks around (like pypdf reading the
+    trailer, xref and page tree) only downloads the parts of the file it touches.
+    """
+    
+    def __init__(self, bucket: str, key: str, size: int, block_size: int = RANGE_BLOCK_SIZE):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.block_size = block_size
+        self.position = 0
+        self._blocks = {}
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            if offset < 0:
+                raise ValueError(f"negative seek value {offset}")
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position = max(self.position + offset, 0)
+        elif whence == io.SEEK_END:
+            self.position = max(self.size + offset, 0)
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        return self.position
+    
+    def _get_block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is None:
+            start = index * self.block_size
+            end = min(start + self.block_size, self.size) - 1
+            response = s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}")
+            block = self._blocks[index] = response['Body'].read()
+        return block
+    
+    def readinto(self, buffer) -> int:
+        end = min(self.position + len(buffer), self.size)
+        count = 0
+        while self.position < end:
+            index, offset = divmod(self.position, self.block_size)
+            chunk = self._get_block(index)[offset:offset + end - self.position]
+            if not chunk:
+                break
+            buffer[count:count + len(chunk)] = chunk
+            count += len(chunk)
+            self.position += len(chunk)
+        return count
+
+
+def get_pdf_page_count(bucket: str, key: str, size: int) -> int:
     """
     Get the number of pages in a PDF file from S3.
     
+    Reads the PDF through S3RangeReader and takes the page count from the page tree
+    root's /Count, so only the header, trailer, xref and catalog blocks are downloaded
+    rather than the whole file. Strict parsing is used for that, because pypdf's
+    lenient mode seeks to every object to validate the xref. PDFs that need the
+    lenient repairs are fetched whole with a single GET and their flattened pages
+    counted, since a repair scan over ranged reads would request every block.
+    
     Args:
         bucket: S3 bucket name
         key: S3 object key
+        size: Object size in bytes (from the listing)
         
     Returns:
         Number of pages in the PDF, or 0 if unable to read
     """
+    source = S3RangeReader(bucket, key, size)
+    try:
+        reader = PdfReader(source, strict=True)
+        return int(reader.trailer['/Root']['/Pages']['/Count'])
+    except Exception:
+        pass
+    
     try:
         response = s3_client.get_object(Bucket=bucket, Key=key)
-        pdf_bytes = response['Body'].read()
-        reader = PdfReader(io.BytesIO(pdf_bytes))
+        reader = PdfReader(io.BytesIO(response['Body'].read()))
         return len(reader.pages)
     except Exception as e:
         print(f"Error getting page count for {key}: {e}")
         return 0
 
 
-def get_file_size(bucket: str, key: str) -> int:
-    """
-    Get the size of a file in S3.
-    
-    Args:
-        bucket: S3 bucket name
-        key: S3 object key
-        
-    Returns:
-        File size in bytes, or 0 if unable to get
-    """
-    try:
-        response = s3_client.head_object(Bucket=bucket, Key=key)
-        return response['ContentLength']
-    except Exception as e:
-        print(f"Error getting file size for {key}: {e}")
-        return 0
-
-
 def list_result_pdfs(bucket: str) -> List[Dict[str, Any]]:
     """
     List all PDF files in the result folder.
@@ -98,58 +194,72 @@ def list_result_pdfs(bucket: str) -> List[Dict[str, Any]]:
     return pdf_files
 
 
-def extract_folder_path_from_result_key(result_key: str) -> str:
+def list_report_keys(bucket: str) -> Optional[Set[str]]:
     """
-    Extract the folder path from a result key.
+    List the accessibility report JSON keys under the temp folder.
     
-    Example: result/folder1/folder2/COMPLIANT_file.pdf -> folder1/folder2
+    One paginated listing replaces a GET (usually a 404) for every report that was
+    never written, e.g. the after report of a PDF that failed remediation. The listing
+    stops after REPORT_LISTING_MAX_PAGES pages, since temp/ also holds every PDF's
+    chunks and intermediate files.
     
     Args:
-        result_key: The S3 key from the result folder
+        bucket: S3 bucket name
         
     Returns:
-        The folder path without 'result/' prefix and filename
+        Set of report keys, or None if the listing failed or hit the page cap (every
+        report is then fetched)
     """
-    # Remove 'result/' prefix
-    path_without_prefix = result_key.replace('result/', '', 1)
-    # Remove the filename
-    parts = path_without_prefix.rsplit('/', 1)
-    if len(parts) > 1:
-        return parts[0]
-    return ''
+    report_keys = set()
+    paginator = s3_client.get_paginator('list_objects_v2')
+    
+    try:
+        for page_number, page in enumerate(paginator.paginate(Bucket=bucket, Prefix='temp/'), 1):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if '/accessability-report/' in key and key.endswith('.json'):
+                    report_keys.add(key)
+            if page_number == REPORT_LISTING_MAX_PAGES and page.get('IsTruncated'):
+                print(f"temp/ has more than {REPORT_LISTING_MAX_PAGES} pages of keys; fetching reports directly")
+                return None
+    except Exception as e:
+        print(f"Error listing accessibility reports in temp folder: {e}")
+        return None
+    
+    return report_keys
 
 
-def extract_original_filename(result_key: str) -> str:
+def parse_result_key(result_key: str) -> Tuple[str, str, str]:
     """
-    Extract the original filename from a result key.
+    Split a result key into its folder path, original filename and filename stem.
     
-    Example: result/folder/COMPLIANT_file.pdf -> file.pdf
+    Example: result/folder1/folder2/COMPLIANT_file.pdf -> ('folder1/folder2', 'file.pdf', 'file')
+    
+    One regex match yields the folder path (without 'result/' prefix and filename)
+    and the original filename (without COMPLIANT_ prefix).
     
     Args:
         result_key: The S3 key from the result folder
         
     Returns:
-        The original filename without COMPLIANT_ prefix
+        Tuple of (folder_path, original_filename, filename_without_ext)
     """
-    filename = os.path.basename(result_key)
-    if filename.startswith('COMPLIANT_'):
-        return filename.replace('COMPLIANT_', '', 1)
-    return filename
+    folder_path, original_filename = _RESULT_KEY_RE.fullmatch(result_key).groups()
+    return folder_path or '', original_filename, os.path.splitext(original_filename)[0]
 
 
-def get_accessibility_report_path(folder_path: str, original_filename: str, report_type: str) -> str:
+def get_accessibility_report_path(folder_path: str, filename_without_ext: str, report_type: str) -> str:
     """
     Construct the S3 path for an accessibility report.
     
     Args:
         folder_path: The folder path (e.g., 'folder1/folder2')
-        original_filename: The original PDF filename without COMPLIANT_ prefix
+        filename_without_ext: The original PDF filename without COMPLIANT_ prefix or extension
         report_type: Either 'before' or 'after'
         
     Returns:
         The S3 key for the accessibility report
     """
-    filename_without_ext = os.path.splitext(original_filename)[0]
     folder_prefix = f"{folder_path}/" if folder_path else ""
     
     if report_type == 'before':
@@ -158,33 +268,38 @@ def get_accessibility_report_path(folder_path: str, original_filename: str, repo
         return f"temp/{folder_prefix}{filename_without_ext}/accessability-report/COMPLIANT_{filename_without_ext}_accessibility_report_after_remidiation.json"
 
 
-def get_error_report_path(folder_path: str, original_filename: str) -> str:
+def get_error_report_path(folder_path: str, filename_without_ext: str) -> str:
     """
     Construct the S3 path for a pre-remediation error report.
     
     Args:
         folder_path: The folder path (e.g., 'folder1/folder2')
-        original_filename: The original PDF filename without COMPLIANT_ prefix
+        filename_without_ext: The original PDF filename without COMPLIANT_ prefix or extension
         
     Returns:
         The S3 key for the error report
     """
-    filename_without_ext = os.path.splitext(original_filename)[0]
     folder_prefix = f"{folder_path}/" if folder_path else ""
     return f"temp/{folder_prefix}{filename_without_ext}/accessability-report/{filename_without_ext}_pre_remediation_ERROR.json"
 
 
-def load_json_from_s3(bucket: str, key: str) -> Optional[Dict]:
+def load_json_from_s3(bucket: str, key: str, report_keys: Optional[Set[str]] = None) -> Optional[Dict]:
     """
     Load a JSON file from S3.
     
     Args:
         bucket: S3 bucket name
         key: S3 object key
+        report_keys: Keys known to exist (from list_report_keys); a key not in it is
+            reported missing without a request. None means fetch unconditionally.
         
     Returns:
         Parsed JSON as dictionary, or None if not found/error
     """
+    if report_keys is not None and key not in report_keys:
+        print(f"JSON file not found: {key}")
+        return None
+    
     try:
         response = s3_client.get_object(Bucket=bucket, Key=key)
         content = response['Body'].read().decode('utf-8')
@@ -213,67 +328,78 @@ def flatten_json(data: Any, prefix: str = '') -> Dict[str, Any]:
         Flattened dictionary with hierarchical column names
     """
     items = {}
+    _flatten_into(data, prefix, items)
+    return items
+
+
+def _flatten_into(data: Any, prefix: str, items: Dict[str, Any]) -> None:
+    """
+    Flatten data into items (the worker behind flatten_json).
     
+    Nested dictionaries write straight into the caller's dict instead of building
+    their own and merging it back, so each column is stored once rather than copied
+    up through every level. An array of objects still collects into its own dict,
+    because duplicate keys are detected among that array's columns only.
+    
+    Args:
+        data: The JSON data to flatten
+        prefix: Prefix for keys
+        items: Flattened dictionary the columns are added to
+    """
     if data is None:
-        return items
+        return
     
     if not isinstance(data, (dict, list)):
         # Simple value
         if prefix:
             items[prefix] = data
-        return items
+        return
     
     if isinstance(data, list):
         # Handle arrays
         if not data:
             items[f"{prefix}-count"] = 0
-            return items
+            return
         
         # Check if it's an array of objects (like summary array or Detailed Report)
         if isinstance(data[0], dict):
             # Flatten each object in the array
             # For arrays like summary, each item has description, status, etc.
+            # Items share their keys, so each key's column name is built once per array
+            array_items = {}
+            col_names = {}
             for i, item in enumerate(data):
                 for key, value in item.items():
                     # Create column name: prefix-key (e.g., before-summary-description)
-                    # For multiple items with same key, we'll use the first one or concatenate
-                    col_name = f"{prefix}-{normalize_key(key)}"
+                    col_name = col_names.get(key)
+                    if col_name is None:
+                        col_name = col_names[key] = f"{prefix}-{normalize_key(key)}"
                     
                     if isinstance(value, (dict, list)):
                         # Recursively flatten nested structures
-                        nested = flatten_json(value, col_name)
-                        items.update(nested)
+                        _flatten_into(value, col_name, array_items)
+                    elif col_name in array_items:
+                        # For duplicate keys across array items, append with index
+                        array_items[f"{col_name}-{i}"] = value
                     else:
-                        # For duplicate keys across array items, append index or concatenate
-                        if col_name in items:
-                            # Append with index for subsequent items
-                            items[f"{col_name}-{i}"] = value
-                        else:
-                            items[col_name] = value
+                        array_items[col_name] = value
+            items.update(array_items)
         else:
             # Array of simple values
             items[f"{prefix}-count"] = len(data)
             items[f"{prefix}-values"] = '; '.join(str(v) for v in data[:10])
-        
-        return items
+        return
     
     # Handle dictionaries
     for key, value in data.items():
         col_name = f"{prefix}-{normalize_key(key)}" if prefix else normalize_key(key)
         
-        if isinstance(value, dict):
-            # Recursively flatten nested dicts
-            nested = flatten_json(value, col_name)
-            items.update(nested)
-        elif isinstance(value, list):
-            # Handle arrays
-            nested = flatten_json(value, col_name)
-            items.update(nested)
+        if isinstance(value, (dict, list)):
+            # Recursively flatten nested dicts and arrays
+            _flatten_into(value, col_name, items)
         else:
             # Simple value
             items[col_name] = value
-    
-    return items
 
 
 def normalize_key(key: str) -> str:
@@ -295,20 +421,30 @@ def normalize_key(key: str) -> str:
     return normalized
 
 
-def build_report_row(bucket: str, pdf_info: Dict) -> Dict[str, Any]:
+def build_report_row(bucket: str, report_keys: Optional[Set[str]], pdf_info: Dict) -> Dict[str, Any]:
     """
     Build a single row of the report for a PDF file.
     
     Args:
         bucket: S3 bucket name
+        report_keys: Report keys from list_report_keys (None to fetch every report)
         pdf_info: Dictionary with PDF file info
         
     Returns:
         Dictionary representing a row in the CSV report
     """
     result_key = pdf_info['key']
-    folder_path = extract_folder_path_from_result_key(result_key)
-    original_filename = extract_original_filename(result_key)
+    print(f"Processing: {result_key}")
+    folder_path, original_filename, filename_without_ext = parse_result_key(result_key)
+    
+    # Start the independent S3 reads together; the error report is only needed (and
+    # only fetched) when the before report is missing
+    before_report_key = get_accessibility_report_path(folder_path, filename_without_ext, 'before')
+    after_report_key = get_accessibility_report_path(folder_path, filename_without_ext, 'after')
+    if INCLUDE_PAGE_COUNT:
+        page_count_future = _fetch_executor.submit(get_pdf_page_count, bucket, result_key, pdf_info['size'])
+    before_future = _fetch_executor.submit(load_json_from_s3, bucket, before_report_key, report_keys)
+    after_future = _fetch_executor.submit(load_json_from_s3, bucket, after_report_key, report_keys)
     
     # Start with basic file info
     row = {
@@ -317,13 +453,13 @@ def build_report_row(bucket: str, pdf_info: Dict) -> Dict[str, Any]:
         'original-filename': original_filename,
         'folder-path': folder_path,
         'file-size-bytes': pdf_info['size'],
-        'last-modified': pdf_info['last_modified'],
-        'page-count': get_pdf_page_count(bucket, result_key)
+        'last-modified': pdf_info['last_modified']
     }
+    if INCLUDE_PAGE_COUNT:
+        row['page-count'] = page_count_future.result()
     
     # Load before remediation report
-    before_report_key = get_accessibility_report_path(folder_path, original_filename, 'before')
-    before_data = load_json_from_s3(bucket, before_report_key)
+    before_data = before_future.result()
     if before_data:
         row['before-report-found'] = True
         row['before-report-error'] = False
@@ -332,8 +468,8 @@ def build_report_row(bucket: str, pdf_info: Dict) -> Dict[str, Any]:
     else:
         row['before-report-found'] = False
         # Check if there's an error report
-        error_report_key = get_error_report_path(folder_path, original_filename)
-        error_data = load_json_from_s3(bucket, error_report_key)
+        error_report_key = get_error_report_path(folder_path, filename_without_ext)
+        error_data = load_json_from_s3(bucket, error_report_key, report_keys)
         if error_data:
             row['before-report-error'] = True
             row['before-error-type'] = error_data.get('error_type', 'Unknown')
@@ -345,8 +481,7 @@ def build_report_row(bucket: str, pdf_info: Dict) -> Dict[str, Any]:
             row['before-error-message'] = 'No before report or error log found'
     
     # Load after remediation report
-    after_report_key = get_accessibility_report_path(folder_path, original_filename, 'after')
-    after_data = load_json_from_s3(bucket, after_report_key)
+    after_data = after_future.result()
     if after_data:
         row['after-report-found'] = True
         flattened_after = flatten_json(after_data, 'after')
@@ -373,15 +508,10 @@ def collect_all_columns(rows: List[Dict]) -> List[str]:
     Returns:
         Ordered list of all unique column names
     """
-    # Use a list to preserve order of first appearance
-    all_columns_ordered = []
-    seen = set()
-    
-    for row in rows:
-        for key in row.keys():
-            if key not in seen:
-                all_columns_ordered.append(key)
-                seen.add(key)
+    # Union of every row's keys in order of first appearance, in one C-level pass
+    # (dict keys keep insertion order and double as the membership set)
+    all_columns_ordered = dict.fromkeys(chain.from_iterable(rows))
+    seen = all_columns_ordered
     
     # Define column groups
     basic_cols = ['file-path', 'file-name', 'original-filename', 'folder-path', 
@@ -413,47 +543,23 @@ def collect_all_columns(rows: List[Dict]) -> List[str]:
     return basic_cols + status_cols + other_cols + before_cols + after_cols
 
 
-def generate_excel_content(rows: List[Dict], columns: List[str]) -> bytes:
+def generate_excel_content(rows: List[Dict], columns: List[str], output: IO[bytes]) -> None:
     """
-    Generate Excel content from rows and columns with formatting.
+    Write the Excel report for rows and columns to a binary file, with formatting.
+    
+    Uses openpyxl's write-only mode, which streams each row to the file as it is
+    appended instead of building every cell object in memory first.
     
     Args:
         rows: List of row dictionaries
         columns: List of column names
-        
-    Returns:
-        Excel file content as bytes
+        output: Binary file object the .xlsx content is written to
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "PDF Processing Report"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("PDF Processing Report")
     
-    # Header styling
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
-    
-    # Write headers
-    for col_idx, column in enumerate(columns, start=1):
-        cell = ws.cell(row=1, column=col_idx)
-        cell.value = column
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Set header row height to accommodate wrapped text
-    ws.row_dimensions[1].height = 60  # Taller height for wrapped headers
-    
-    # Write data rows
-    for row_idx, row in enumerate(rows, start=2):
-        for col_idx, column in enumerate(columns, start=1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            value = row.get(column, '')
-            cell.value = value
-            # Enable text wrapping for all cells
-            cell.alignment = Alignment(vertical="top", wrap_text=True)
-    
-    # Auto-adjust column widths with reasonable limits
+    # Column widths, the frozen header and the header height must all be set before
+    # any row is written
     for col_idx, column in enumerate(columns, start=1):
         # Set a fixed reasonable width that encourages wrapping
         # Basic file info columns can be wider, others narrower
@@ -470,20 +576,47 @@ def generate_excel_content(rows: List[Dict], columns: List[str]) -> bytes:
     # Freeze the header row
     ws.freeze_panes = "A2"
     
-    # Save to bytes
-    output = io.BytesIO()
+    # Set header row height to accommodate wrapped text
+    ws.row_dimensions[1].height = 60  # Taller height for wrapped headers
+    
+    # Header styling
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    header_alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
+    
+    # Write headers
+    header_cells = []
+    for column in columns:
+        cell = WriteOnlyCell(ws, value=column)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+    
+    # Write data rows, with text wrapping enabled for all cells
+    data_alignment = Alignment(vertical="top", wrap_text=True)
+    for row in rows:
+        row_cells = []
+        for column in columns:
+            cell = WriteOnlyCell(ws, value=row.get(column, ''))
+            cell.alignment = data_alignment
+            row_cells.append(cell)
+        ws.append(row_cells)
+    
     wb.save(output)
-    output.seek(0)
-    return output.read()
 
 
-def save_excel_to_s3(bucket: str, excel_content: bytes) -> str:
+def save_excel_to_s3(bucket: str, excel_file: IO[bytes]) -> str:
     """
-    Save Excel content to S3.
+    Upload an Excel report file to S3.
+    
+    The file is streamed with upload_fileobj, which switches to a multipart upload
+    for large reports instead of reading the whole file into one request body.
     
     Args:
         bucket: S3 bucket name
-        excel_content: Excel file content as bytes
+        excel_file: Binary file object positioned at the start of the Excel content
         
     Returns:
         S3 key where the Excel file was saved
@@ -499,11 +632,11 @@ def save_excel_to_s3(bucket: str, excel_content: bytes) -> str:
     
     key = f"reports/pdf_processing_reports/pdf-processing-report-{timestamp}.xlsx"
     
-    s3_client.put_object(
-        Bucket=bucket,
-        Key=key,
-        Body=excel_content,
-        ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    s3_client.upload_fileobj(
+        excel_file,
+        bucket,
+        key,
+        ExtraArgs={'ContentType': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
     )
     
     print(f"Excel report saved to s3://{bucket}/{key} (version: {VERSION})")
@@ -532,6 +665,9 @@ def lambda_handler(event: Dict, context: Any) -> Dict:
     
     print(f"Generating PDF processing report for bucket: {bucket} (version: {VERSION})")
     
+    # List the existing accessibility reports while the result folder is listed
+    report_keys_future = _fetch_executor.submit(list_report_keys, bucket)
+    
     # List all PDFs in result folder
     pdf_files = list_result_pdfs(bucket)
     print(f"Found {len(pdf_files)} PDF files in result folder")
@@ -542,19 +678,17 @@ def lambda_handler(event: Dict, context: Any) -> Dict:
             'body': 'No PDF files found in result folder.'
         }
     
-    # Build report rows
-    rows = []
-    for pdf_info in pdf_files:
-        print(f"Processing: {pdf_info['key']}")
-        row = build_report_row(bucket, pdf_info)
-        rows.append(row)
+    # Build report rows concurrently (map keeps them in listing order)
+    with ThreadPoolExecutor(max_workers=ROW_WORKERS) as executor:
+        rows = list(executor.map(partial(build_report_row, bucket, report_keys_future.result()), pdf_files))
     
-    # Collect all columns and generate Excel
+    # Collect all columns and generate Excel into a temp file (Lambda /tmp), then
+    # stream that file to S3
     columns = collect_all_columns(rows)
-    excel_content = generate_excel_content(rows, columns)
-    
-    # Save to S3
-    report_key = save_excel_to_s3(bucket, excel_content)
+    with tempfile.TemporaryFile() as excel_file:
+        generate_excel_content(rows, columns, excel_file)
+        excel_file.seek(0)
+        report_key = save_excel_to_s3(bucket, excel_file)
     
     return {
         'statusCode': 200,
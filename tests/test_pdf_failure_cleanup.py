@@ -0,0 +1,110 @@
+"""
+Tests for the PDF failure cleanup Lambda's SQS batch handling.
+
+Run with: pip install -r tests/requirements.txt && python -m pytest tests/
+"""
+
+import importlib.util
+import json
+from datetime import datetime
+from pathlib import Path
+
+import boto3
+import pytest
+from moto import mock_aws
+
+CLEANUP_MAIN = Path(__file__).resolve().parent.parent / 'lambda' / 'pdf-failure-cleanup' / 'main.py'
+BUCKET = 'pdf-test-bucket'
+TABLE = 'pdf-failure-records'
+
+
+@pytest.fixture
+def cleanup(monkeypatch):
+    """Load the cleanup Lambda against a mocked bucket and failure records table."""
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('FAILURE_TABLE', TABLE)
+    monkeypatch.setenv('BUCKET_NAME', BUCKET)
+    monkeypatch.setenv('RESOLVE_UPLOADER', 'false')
+
+    with mock_aws():
+        boto3.client('s3').create_bucket(Bucket=BUCKET)
+        boto3.client('dynamodb').create_table(
+            TableName=TABLE,
+            BillingMode='PAY_PER_REQUEST',
+            AttributeDefinitions=[{'AttributeName': 'failure_id', 'AttributeType': 'S'}],
+            KeySchema=[{'AttributeName': 'failure_id', 'KeyType': 'HASH'}]
+        )
+
+        # Module-level clients and settings are created at import, so load it fresh here
+        spec = importlib.util.spec_from_file_location('pdf_failure_cleanup_main', CLEANUP_MAIN)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        monkeypatch.setattr(module.time, 'sleep', lambda seconds: None)
+        yield module
+
+
+def failure_message(message_id: str, pdf_key: str) -> dict:
+    """Build an SQS record carrying a Step Functions failure event for pdf_key."""
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=pdf_key, Body=b'%PDF-1.7')
+    event = {
+        'detail-type': 'Step Functions Execution Status Change',
+        'source': 'aws.states',
+        'detail': {
+            'executionArn': f'arn:aws:states:us-east-1:123456789012:execution:pdf:{message_id}',
+            'status': 'FAILED',
+            'input': json.dumps({'s3_bucket': BUCKET, 's3_key': pdf_key}),
+            'error': 'States.TaskFailed',
+            'cause': 'boom'
+        }
+    }
+    return {'messageId': message_id, 'body': json.dumps(event)}
+
+
+def stored_pdf_keys() -> list:
+    items = boto3.resource('dynamodb').Table(TABLE).scan()['Items']
+    return sorted(item['pdf_key'] for item in items)
+
+
+def test_fully_stored_batch_reports_no_failures(cleanup):
+    messages = [failure_message('m1', 'pdf/a/one.pdf'), failure_message('m2', 'pdf/b/two.pdf')]
+
+    response = cleanup.handle_sqs_batch(messages, datetime.utcnow(), float('inf'))
+
+    assert response == {'batchItemFailures': []}
+    assert stored_pdf_keys() == ['pdf/a/one.pdf', 'pdf/b/two.pdf']
+
+
+def test_unprocessed_items_are_reported_for_their_messages(cleanup, monkeypatch):
+    messages = [
+        failure_message('m1', 'pdf/a/one.pdf'),
+        failure_message('m2', 'pdf/b/two.pdf'),
+        failure_message('m3', 'pdf/c/three.pdf')
+    ]
+    batch_write_item = cleanup.dynamodb_client.batch_write_item
+
+    def leave_two_unprocessed(RequestItems):
+        # Write everything except two.pdf, which DynamoDB keeps handing back
+        requests = RequestItems[TABLE]
+        unprocessed = [r for r in requests if r['PutRequest']['Item']['pdf_key']['S'] == 'pdf/b/two.pdf']
+        written = [r for r in requests if r not in unprocessed]
+        if written:
+            batch_write_item(RequestItems={TABLE: written})
+        return {'UnprocessedItems': {TABLE: unprocessed} if unprocessed else {}}
+
+    monkeypatch.setattr(cleanup.dynamodb_client, 'batch_write_item', leave_two_unprocessed)
+
+    response = cleanup.handle_sqs_batch(messages, datetime.utcnow(), float('inf'))
+
+    assert response == {'batchItemFailures': [{'itemIdentifier': 'm2'}]}
+    assert stored_pdf_keys() == ['pdf/a/one.pdf', 'pdf/c/three.pdf']
+
+
+def test_malformed_body_is_not_redelivered(cleanup):
+    messages = [{'messageId': 'bad', 'body': 'not json'}, failure_message('m1', 'pdf/a/one.pdf')]
+
+    response = cleanup.handle_sqs_batch(messages, datetime.utcnow(), float('inf'))
+
+    assert response == {'batchItemFailures': []}
+    assert stored_pdf_keys() == ['pdf/a/one.pdf']